@@ -1,13 +1,33 @@
 from django.contrib import admin
+from django.db import connection
 
+from .autocomplete import get_matching_ids, is_large
 from .models import (
     Category, Location, Post, Comment
 )
+from .search import build_match_query
+
+
+class AutocompleteSearchMixin:
+    """Поиск по триграммному индексу автодополнения вместо LIKE"""
+
+    autocomplete_kind = None
+
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term.strip() or connection.vendor != 'sqlite':
+            return super().get_search_results(
+                request, queryset, search_term
+            )
+        ids = get_matching_ids(
+            self.autocomplete_kind, search_term, published_only=False
+        )
+        return queryset.filter(pk__in=ids), False
 
 
 @admin.register(Category)
-class CategoryAdmin(admin.ModelAdmin):
-    search_fields = ('text',)
+class CategoryAdmin(AutocompleteSearchMixin, admin.ModelAdmin):
+    autocomplete_kind = 'category'
+    search_fields = ('title',)
     list_display = ('id', 'is_published', 'created_at', 'title',
                     'description', 'slug',)
     list_display_links = ('id',)
@@ -16,8 +36,9 @@ class CategoryAdmin(admin.ModelAdmin):
 
 
 @admin.register(Location)
-class LocationAdmin(admin.ModelAdmin):
-    search_fields = ('text',)
+class LocationAdmin(AutocompleteSearchMixin, admin.ModelAdmin):
+    autocomplete_kind = 'location'
+    search_fields = ('name',)
     list_display = ('id', 'is_published', 'created_at', 'name',)
     list_display_links = ('id',)
     list_filter = ('is_published',)
@@ -26,7 +47,7 @@ class LocationAdmin(admin.ModelAdmin):
 
 @admin.register(Post)
 class PostAdmin(admin.ModelAdmin):
-    search_fields = ('text',)
+    search_fields = ('title', 'text',)
     list_display = ('id', 'title', 'author', 'text', 'category',
                     'pub_date', 'location', 'is_published', 'created_at',)
     list_display_links = ('title',)
@@ -34,5 +55,22 @@ class PostAdmin(admin.ModelAdmin):
     list_filter = ('created_at',)
     empty_value_display = 'Не задано'
 
+    def get_autocomplete_fields(self, request):
+        # Списки из всех строк таблицы, в том числе в каждой строке
+        # list_editable, выводятся только для небольших таблиц
+        return [
+            name for name in ('author', 'category', 'location')
+            if is_large(Post._meta.get_field(name).related_model)
+        ]
+
+    def get_search_results(self, request, queryset, search_term):
+        # Поиск по индексу FTS5 вместо LIKE '%...%' по всей таблице
+        match = build_match_query(search_term)
+        if match is None or connection.vendor != 'sqlite':
+            return super().get_search_results(
+                request, queryset, search_term
+            )
+        return queryset.filter(search_index__document__match=match), False
+
 
 admin.site.register(Comment)
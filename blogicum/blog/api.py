@@ -0,0 +1,241 @@
+import json
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import Http404, JsonResponse, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.views import View
+
+from .models import Category, Comment, Post
+from .paginators import KeysetPaginator
+from .utils import get_filter_posts, get_profile_posts, get_readable_posts
+
+User = get_user_model()
+
+# Поле ответа: столбцы, которые нужно для него выбрать
+POST_FIELDS = {
+    'id': ('id',),
+    'url': ('id',),
+    'title': ('title',),
+    'text': ('text',),
+    'pub_date': ('pub_date',),
+    'author': ('author__username',),
+    'category': ('category__slug', 'category__title'),
+    'location': ('location__name', 'location__is_published'),
+    'image': ('image',),
+    'comment_count': ('comment_count',),
+}
+COMMENT_FIELDS = ('id', 'text', 'created_at', 'author__username')
+CURSOR_KEYS = ('pub_date', 'id')
+
+
+class ApiError(Exception):
+    """Некорректные параметры запроса к API"""
+
+
+def dumps(value):
+    return json.dumps(value, cls=DjangoJSONEncoder, ensure_ascii=False)
+
+
+def stream_object(parts):
+    """
+    Отдаёт JSON-объект по частям.
+
+    parts — пары (ключ, значение); значение-генератор выводится
+    как массив, элемент за элементом.
+    """
+    yield '{'
+    for index, (key, value) in enumerate(parts):
+        yield (',' if index else '') + dumps(key) + ':'
+        if isinstance(value, (list, dict, str, int, type(None))):
+            yield dumps(value)
+            continue
+        yield '['
+        for item_index, item in enumerate(value):
+            yield (',' if item_index else '') + dumps(item)
+        yield ']'
+    yield '}'
+
+
+def serialize_post(row, fields, request):
+    data = {}
+    for field in fields:
+        if field == 'url':
+            value = request.build_absolute_uri(
+                reverse('blog:post_detail', args=(row['id'],))
+            )
+        elif field == 'author':
+            value = row['author__username']
+        elif field == 'category':
+            value = row['category__slug'] and {
+                'slug': row['category__slug'],
+                'title': row['category__title'],
+            }
+        elif field == 'location':
+            value = (
+                row['location__name'] if row['location__is_published']
+                else None
+            )
+        elif field == 'image':
+            value = row['image'] and request.build_absolute_uri(
+                Post._meta.get_field('image').storage.url(row['image'])
+            )
+        else:
+            value = row[field]
+        data[field] = value
+    return data
+
+
+def serialize_comment(row):
+    return {
+        'id': row['id'],
+        'text': row['text'],
+        'created_at': row['created_at'],
+        'author': row['author__username'],
+    }
+
+
+class ApiView(View):
+    """
+    Базовое представление JSON API только для чтения.
+
+    Выбираются только запрошенные поля (?fields=id,title) через
+    queryset.values(); ответ отдаётся потоком: строки страницы
+    загружаются заранее, а JSON формируется по одному объекту
+    в момент отправки.
+    """
+
+    http_method_names = ('get', 'head', 'options')
+    fields_kwarg = 'fields'
+    cursor_kwarg = 'cursor'
+    limit_kwarg = 'limit'
+
+    def dispatch(self, request, *args, **kwargs):
+        try:
+            return super().dispatch(request, *args, **kwargs)
+        except ApiError as error:
+            return JsonResponse({'error': str(error)}, status=400)
+        except Http404:
+            return JsonResponse({'error': 'Не найдено'}, status=404)
+
+    def get_fields(self):
+        value = self.request.GET.get(self.fields_kwarg)
+        if not value:
+            return tuple(POST_FIELDS)
+        fields = tuple(dict.fromkeys(
+            name.strip() for name in value.split(',') if name.strip()
+        ))
+        unknown = [name for name in fields if name not in POST_FIELDS]
+        if unknown:
+            raise ApiError('Неизвестные поля: ' + ', '.join(unknown))
+        return fields
+
+    def get_columns(self, fields, *extra):
+        columns = dict.fromkeys(extra)
+        for field in fields:
+            columns.update(dict.fromkeys(POST_FIELDS[field]))
+        return tuple(columns)
+
+    def get_limit(self):
+        value = self.request.GET.get(self.limit_kwarg)
+        if value is None:
+            return settings.API_PAGE_SIZE
+        try:
+            limit = int(value)
+        except ValueError:
+            raise ApiError('Параметр limit должен быть целым числом')
+        return min(max(limit, 1), settings.API_MAX_PAGE_SIZE)
+
+    def get_page_url(self, cursor):
+        if cursor is None:
+            return None
+        params = self.request.GET.copy()
+        params[self.cursor_kwarg] = cursor
+        return self.request.build_absolute_uri(
+            self.request.path + '?' + params.urlencode()
+        )
+
+    def render(self, parts):
+        return StreamingHttpResponse(
+            (chunk.encode() for chunk in stream_object(parts)),
+            content_type='application/json',
+        )
+
+
+class PostListApiView(ApiView):
+    """Лента постов, как в PostListView"""
+
+    def get_queryset(self):
+        return get_filter_posts()
+
+    def get(self, request, *args, **kwargs):
+        fields = self.get_fields()
+        paginator = KeysetPaginator(
+            self.get_queryset().values(
+                *self.get_columns(fields, *CURSOR_KEYS)
+            ),
+            self.get_limit(),
+            keys=CURSOR_KEYS,
+        )
+        # Страница выбирается сразу, чтобы запросы к базе не
+        # выполнялись во время отправки ответа.
+        page = paginator.get_page(request.GET.get(self.cursor_kwarg))
+        return self.render((
+            ('results', (
+                serialize_post(row, fields, request) for row in page
+            )),
+            ('next', self.get_page_url(page.next_cursor)),
+            ('previous', self.get_page_url(page.previous_cursor)),
+        ))
+
+
+class CategoryPostsApiView(PostListApiView):
+    """Посты категории, как в CategoryPostsView"""
+
+    def get_queryset(self):
+        category = get_object_or_404(
+            Category, slug=self.kwargs['category_slug'], is_published=True
+        )
+        return get_filter_posts().filter(category=category)
+
+
+class ProfilePostsApiView(PostListApiView):
+    """
+    Посты пользователя: автору — все, остальным — только видимые,
+    как в публичных лентах и RSS, без отложенных и скрытых категорий.
+    """
+
+    def get_queryset(self):
+        profile = get_object_or_404(User, username=self.kwargs['username'])
+        if self.request.user == profile:
+            return get_profile_posts(profile, profile)
+        return get_filter_posts().filter(author=profile)
+
+
+class PostDetailApiView(ApiView):
+    """Пост и порция его комментариев, как в PostDetailView"""
+
+    def get(self, request, *args, **kwargs):
+        fields = self.get_fields()
+        post = get_object_or_404(
+            get_readable_posts(request.user).values(
+                *self.get_columns(fields, 'id')
+            ),
+            pk=self.kwargs['id'],
+        )
+        paginator = KeysetPaginator(
+            Comment.objects.filter(post_id=post['id']).values(
+                *COMMENT_FIELDS
+            ),
+            settings.COMMENTS_PER_PAGE,
+            keys=('created_at', 'id'),
+            descending=False,
+        )
+        comments = paginator.get_page(request.GET.get(self.cursor_kwarg))
+        return self.render((
+            ('result', serialize_post(post, fields, request)),
+            ('comments', (serialize_comment(row) for row in comments)),
+            ('next', self.get_page_url(comments.next_cursor)),
+        ))
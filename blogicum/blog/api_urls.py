@@ -0,0 +1,23 @@
+from django.urls import path
+
+from . import api
+
+app_name = 'api_v1'
+
+urlpatterns = [
+    path('posts/', api.PostListApiView.as_view(), name='posts'),
+    path(
+        'posts/<int:id>/', api.PostDetailApiView.as_view(),
+        name='post_detail'
+    ),
+    path(
+        'category/<slug:category_slug>/',
+        api.CategoryPostsApiView.as_view(),
+        name='category_posts'
+    ),
+    path(
+        'profile/<str:username>/',
+        api.ProfilePostsApiView.as_view(),
+        name='profile'
+    ),
+]
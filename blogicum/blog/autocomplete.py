@@ -0,0 +1,85 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.db.models.functions import Length
+
+from .models import AutocompleteEntry, Category, Location
+
+# Триграммный индекс ищет подстроки не короче трёх символов
+TRIGRAM_LENGTH = 3
+
+User = get_user_model()
+
+KINDS = {
+    'category': (Category, 'title', {'is_published': True}),
+    'location': (Location, 'name', {'is_published': True}),
+    'author': (User, 'username', {'is_active': True}),
+}
+
+
+def is_large(model):
+    """
+    Больше ли в таблице записей, чем settings.AUTOCOMPLETE_THRESHOLD.
+
+    Количество кешируется: выпадающий список меняется на
+    автодополнение не мгновенно, а в пределах таймаута кеша.
+    """
+    key = f'blog:table-size:{model._meta.label_lower}'
+    size = cache.get(key)
+    if size is None:
+        size = model.objects.count()
+        cache.set(key, size, settings.AUTOCOMPLETE_COUNT_CACHE_TIMEOUT)
+    return size > settings.AUTOCOMPLETE_THRESHOLD
+
+
+def get_entries(kind, query):
+    """Записи индекса, в названии которых есть подстрока query"""
+    entries = AutocompleteEntry.objects.filter(kind=kind)
+    if len(query) >= TRIGRAM_LENGTH:
+        phrase = query.replace('"', '""')
+        return entries.filter(document__match=f'"{phrase}"')
+    # Слишком короткая строка для триграмм: берём совпадения по началу
+    return entries.filter(label__istartswith=query)
+
+
+def get_matching_ids(kind, query, published_only=True):
+    """
+    Идентификаторы объектов, подходящих под запрос, без ограничения
+    количества; для поиска в админке.
+    """
+    entries = get_entries(kind, query.strip())
+    if published_only:
+        entries = entries.filter(is_published=True)
+    return entries.values('object_id')
+
+
+def autocomplete(kind, query, limit=None):
+    """
+    Не более limit пар (id, название) вида kind, содержащих query.
+
+    Совпадения с начала названия идут первыми, затем более короткие
+    названия. Без FTS5 (не SQLite) поиск идёт по исходной таблице.
+    """
+    if limit is None:
+        limit = settings.AUTOCOMPLETE_LIMIT
+    query = query.strip()
+    if not query:
+        return []
+    if connection.vendor != 'sqlite':
+        model, label, published = KINDS[kind]
+        rows = model.objects.filter(
+            **published, **{f'{label}__icontains': query}
+        ).order_by(Length(label), label).values_list('pk', label)
+    else:
+        rows = get_entries(kind, query).filter(
+            is_published=True
+        ).order_by(Length('label'), 'label').values_list(
+            'object_id', 'label'
+        )
+    # Запас кандидатов, чтобы поднять совпадения по началу названия:
+    # SQLite приводит к нижнему регистру только латиницу.
+    candidates = list(rows[:limit * 3])
+    folded = query.casefold()
+    candidates.sort(key=lambda row: not row[1].casefold().startswith(folded))
+    return candidates[:limit]
@@ -0,0 +1,188 @@
+import statistics
+import time
+
+from django.db import connection
+from django.test import Client
+from django.urls import URLPattern, reverse
+from django.utils import timezone
+
+from blog import urls as blog_urls
+from pages import urls as pages_urls
+
+from .middleware import QueryStats
+from .models import Comment, Post
+from .sitemaps import get_shard, refresh_sitemaps
+
+PERCENTILES = (50, 95, 99)
+ANONYMOUS = 'anonymous'
+# Маршруты, которые открывает не автор поста, а автор комментария
+COMMENTER_ROUTES = {'blog:edit_comment', 'blog:delete_comment'}
+
+
+def get_routes():
+    """Имена и шаблоны всех маршрутов blog/urls.py и pages/urls.py"""
+    for module in (blog_urls, pages_urls):
+        for pattern in module.urlpatterns:
+            if isinstance(pattern, URLPattern):
+                yield f'{module.app_name}:{pattern.name}', pattern
+
+
+def get_sample():
+    """
+    Объекты, на которых меряются маршруты: видимый пост с наибольшим
+    числом комментариев и один из его комментариев.
+    """
+    post = Post.objects.filter(
+        is_visible=True, pub_date__lte=timezone.now()
+    ).select_related('author', 'category').order_by(
+        '-comment_count', 'pk'
+    ).first()
+    if post is None:
+        return None
+    comment = Comment.objects.filter(post=post).select_related(
+        'author'
+    ).order_by('pk').first()
+    return post, comment
+
+
+def get_arguments(post, comment):
+    """Значения параметров маршрутов по имени параметра"""
+    return {
+        'id': post.pk,
+        'post_id': post.pk,
+        'comment_id': comment.pk if comment else None,
+        'category_slug': post.category.slug,
+        'username': post.author.username,
+        'section': 'posts',
+        'shard': get_shard(post.pk),
+        'kind': 'category',
+    }
+
+
+def get_query(name, post):
+    if name == 'blog:search':
+        return {'q': post.title.split()[0]}
+    if name == 'blog:autocomplete':
+        return {'q': post.category.title[:3]}
+    return {}
+
+
+def build_cases(post, comment):
+    """
+    Запросы для замера: (метка, url, параметры, кто открывает).
+
+    Каждый маршрут открывает вошедший пользователь, а общедоступные
+    ещё и аноним — его ответы обычно отдаёт кеш страниц.
+    """
+    arguments = get_arguments(post, comment)
+    cases = []
+    for name, pattern in get_routes():
+        names = pattern.pattern.converters.keys()
+        if any(arguments.get(key) is None for key in names):
+            continue
+        url = reverse(name, kwargs={key: arguments[key] for key in names})
+        user = (
+            comment.author if name in COMMENTER_ROUTES else post.author
+        )
+        query = get_query(name, post)
+        cases.append((name, url, query, user))
+        cases.append((f'{name} [{ANONYMOUS}]', url, query, None))
+    return cases
+
+
+def fetch(client, url, query):
+    """Один запрос: (код ответа, секунды, SQL-запросы, байты)"""
+    stats = QueryStats()
+    with connection.execute_wrapper(stats):
+        start = time.perf_counter()
+        response = client.get(url, query)
+        if response.streaming:
+            size = sum(len(chunk) for chunk in response.streaming_content)
+        else:
+            size = len(response.content)
+        elapsed = time.perf_counter() - start
+    return response.status_code, elapsed, stats.count, size
+
+
+def percentile(values, percent):
+    if len(values) == 1:
+        return values[0]
+    return statistics.quantiles(values, n=100, method='inclusive')[
+        percent - 1
+    ]
+
+
+def measure(client, url, query, requests, warmup):
+    """Прогревает маршрут и собирает статистику по requests запросам"""
+    for _ in range(warmup):
+        fetch(client, url, query)
+    samples = [fetch(client, url, query) for _ in range(requests)]
+    timings = [sample[1] * 1000 for sample in samples]
+    result = {
+        'status': samples[-1][0],
+        'mean_ms': statistics.fmean(timings),
+        'queries': max(sample[2] for sample in samples),
+        'bytes': samples[-1][3],
+    }
+    for percent in PERCENTILES:
+        result[f'p{percent}_ms'] = percentile(timings, percent)
+    return result
+
+
+def run(requests, warmup, only=None):
+    """
+    Замеряет все маршруты на текущей базе. Анонимные варианты,
+    которые не отдают 200 (вход обязателен), в отчёт не попадают.
+    """
+    sample = get_sample()
+    if sample is None:
+        return None
+    # Карту сайта строит команда по расписанию, а не запросы
+    refresh_sitemaps()
+    clients = {}
+    results = {}
+    for label, url, query, user in build_cases(*sample):
+        if only and not any(part in label for part in only):
+            continue
+        if user not in clients:
+            # Ошибка представления попадает в отчёт кодом 500
+            clients[user] = Client(raise_request_exception=False)
+            if user is not None:
+                clients[user].force_login(user)
+        client = clients[user]
+        if user is None and fetch(client, url, query)[0] != 200:
+            continue
+        results[label] = {'url': url, **measure(
+            client, url, query, requests, warmup
+        )}
+    return results
+
+
+def compare(baseline, current, threshold, min_delta_ms=1.0):
+    """
+    Регрессии текущего прогона относительно прежнего.
+
+    Регрессией считается рост p95 больше чем на долю threshold
+    (и не меньше min_delta_ms, чтобы не ловить шум быстрых
+    маршрутов), рост числа SQL-запросов или смена кода ответа.
+    """
+    regressions = []
+    for label, result in current.items():
+        old = baseline.get(label)
+        if old is None:
+            continue
+        problems = []
+        if result['status'] != old['status']:
+            problems.append(f"код ответа {old['status']} → {result['status']}")
+        if result['queries'] > old['queries']:
+            problems.append(
+                f"SQL-запросов {old['queries']} → {result['queries']}"
+            )
+        delta = result['p95_ms'] - old['p95_ms']
+        if delta > old['p95_ms'] * threshold and delta > min_delta_ms:
+            problems.append(
+                f"p95 {old['p95_ms']:.1f} → {result['p95_ms']:.1f} мс"
+            )
+        if problems:
+            regressions.append((label, problems))
+    return regressions
@@ -0,0 +1,130 @@
+import time
+from datetime import datetime, timezone as dt_timezone
+
+from django.core.cache import cache, caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.utils import timezone
+
+from .models import Post
+
+VERSION_KEY = 'blog:version:{}'
+HORIZON_KEY = 'blog:visibility-horizon:{}'
+# Версия всех данных блога; её меняют команды, пишущие в обход сигналов
+DATASET_VERSION = 'dataset'
+LOCAL_CACHE_WARNING = (
+    'Кеш по умолчанию свой у каждого процесса (LocMemCache): сброс '
+    'версий не дойдёт до веб-процессов, перезапустите их.'
+)
+
+
+def get_versions(*names):
+    """
+    Возвращает текущие версии именованных наборов данных.
+
+    Отсутствующая в кеше версия инициализируется меткой времени, поэтому
+    вытеснение версии из кеша не может вернуть к жизни старые записи.
+    """
+    keys = {name: VERSION_KEY.format(name) for name in names}
+    found = cache.get_many(keys.values())
+    missing = {
+        key: time.time_ns() for key in keys.values() if key not in found
+    }
+    if missing:
+        cache.set_many(missing, timeout=None)
+        found.update(missing)
+    return {name: found[key] for name, key in keys.items()}
+
+
+def get_version(name):
+    return get_versions(name)[name]
+
+
+def bump_versions(*names):
+    """Делает устаревшими все записи кеша, построенные на этих версиях"""
+    cache.set_many(
+        {VERSION_KEY.format(name): time.time_ns() for name in names},
+        timeout=None
+    )
+
+
+def is_cache_shared():
+    """Видят ли записи кеша по умолчанию другие процессы"""
+    return not isinstance(caches['default'], LocMemCache)
+
+
+def invalidate_dataset():
+    """
+    Делает устаревшими все кеши блога после массовой записи в обход
+    сигналов.
+
+    Возвращает False, если кеш не общий и сброс увидит только
+    текущий процесс.
+    """
+    bump_versions(DATASET_VERSION, 'posts', 'content')
+    return is_cache_shared()
+
+
+def attach_card_versions(posts):
+    """
+    Проставляет постам post.card_version для кеша карточек.
+
+    Версия карточки складывается из версий данных, поста, его
+    категории, местоположения и автора; все они читаются одним
+    обращением к кешу.
+    """
+    names = {}
+    for post in posts:
+        names[post.pk] = (
+            DATASET_VERSION,
+            f'post:{post.pk}',
+            f'category:{post.category_id}',
+            f'location:{post.location_id}',
+            f'user:{post.author_id}',
+        )
+    versions = get_versions(*{name for row in names.values() for name in row})
+    for post in posts:
+        post.card_version = '-'.join(
+            str(versions[name]) for name in names[post.pk]
+        )
+    return posts
+
+
+def get_visibility_horizon():
+    """
+    Ближайший момент, когда станет видимым отложенный пост, или None.
+
+    Значение кешируется до этого момента; запись постов и категорий
+    меняет версию «posts» и вместе с ней ключ кеша.
+    """
+    key = HORIZON_KEY.format(get_version('posts'))
+    now = timezone.now()
+    timestamp = cache.get(key)
+    if timestamp is None or timestamp and timestamp <= now.timestamp():
+        horizon = Post.objects.filter(
+            is_visible=True, pub_date__gt=now
+        ).order_by('pub_date').values_list('pub_date', flat=True).first()
+        # False — отложенных постов нет, None — значения нет в кеше
+        timestamp = horizon.timestamp() if horizon else False
+        cache.set(
+            key, timestamp,
+            timestamp - now.timestamp() if horizon else None,
+        )
+    if not timestamp:
+        return None
+    return datetime.fromtimestamp(timestamp, tz=dt_timezone.utc)
+
+
+def cap_timeout(timeout):
+    """
+    Время жизни записи кеша, которое не переходит горизонт видимости.
+
+    0 означает, что запись не стоит кешировать: отложенный пост
+    вот-вот станет видимым.
+    """
+    horizon = get_visibility_horizon()
+    if horizon is None:
+        return timeout
+    remaining = int((horizon - timezone.now()).total_seconds())
+    if timeout is None:
+        return max(remaining, 0)
+    return max(min(timeout, remaining), 0)
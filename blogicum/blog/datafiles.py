@@ -0,0 +1,227 @@
+import datetime
+import gzip
+import json
+import os
+from contextlib import contextmanager
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.core.management.color import no_style
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection
+
+from .models import Category, Comment, Location, Post
+
+READ_SIZE = 1 << 16
+# Наибольший размер одного элемента JSON-массива, в символах
+MAX_RECORD_SIZE = 1 << 24
+EXTENSION = '.jsonl.gz'
+
+# Модели в порядке зависимостей: на каждую ссылаются только следующие
+MODELS = (get_user_model(), Category, Location, Post, Comment)
+# Поля пользователя, без которых не восстановить авторов; хеши паролей,
+# почта и права выгружаются только по явному запросу
+USER_FIELDS = (
+    'username', 'first_name', 'last_name', 'is_active', 'date_joined'
+)
+
+_decoder = json.JSONDecoder()
+
+
+class RecordEncoder(DjangoJSONEncoder):
+    """Пишет даты с микросекундами, DjangoJSONEncoder их округляет"""
+
+    def default(self, o):
+        if isinstance(o, (datetime.datetime, datetime.time)):
+            return o.isoformat()
+        return super().default(o)
+
+
+def open_text(path, mode='rt', compressed=None):
+    """Открывает файл данных, сжатые .gz — прозрачно"""
+    if compressed is None:
+        compressed = str(path).endswith('.gz')
+    if compressed:
+        return gzip.open(path, mode, encoding='utf-8')
+    return open(path, mode, encoding='utf-8')
+
+
+def is_json_lines(path):
+    name = str(path)
+    if name.endswith('.gz'):
+        name = name[:-3]
+    return name.endswith('.jsonl')
+
+
+def _decode_item(buffer, position):
+    """
+    Разбирает элемент с позиции position: (элемент, конец) или
+    (None, None), если элемент обрезан концом буфера и нужно дочитать
+    файл. Испорченный или слишком длинный элемент — ValueError.
+    """
+    try:
+        return _decoder.raw_decode(buffer, position)
+    except json.JSONDecodeError as error:
+        # Обрезанная строка сообщает о своём начале, остальные ошибки
+        # обрезки — о конце буфера или о неполной \uXXXX перед ним
+        incomplete = (
+            error.msg.startswith('Unterminated string')
+            or error.pos >= len(buffer) - 6
+        )
+        if not incomplete:
+            raise ValueError(f'Испорченный элемент в файле данных: {error}')
+        if len(buffer) - position > MAX_RECORD_SIZE:
+            raise ValueError(
+                f'Элемент файла данных длиннее {MAX_RECORD_SIZE} символов: '
+                f'{error}'
+            )
+        return None, None
+
+
+def _iter_array(file):
+    """
+    Элементы JSON-массива верхнего уровня по одному.
+
+    Файл читается блоками, в памяти держится только недоразобранный
+    хвост, а не весь массив, как при json.load: испорченный элемент
+    сразу вызывает ValueError, а не дочитывание файла в буфер.
+    """
+    buffer = ''
+    position = 0
+    started = finished = False
+    while True:
+        # Пропуск пробелов, запятых и скобок массива между элементами
+        while position < len(buffer) and buffer[position] in ' \t\r\n,[]':
+            started = started or buffer[position] == '['
+            position += 1
+        if position < len(buffer):
+            if not started:
+                raise ValueError('Ожидался JSON-массив объектов')
+            item, end = _decode_item(buffer, position)
+            # Число в конце блока может быть обрезано: нужен следующий
+            if end is not None and (end < len(buffer) or finished):
+                yield item
+                position = end
+                continue
+        if finished:
+            if position < len(buffer):
+                raise ValueError('Файл данных обрывается на середине')
+            return
+        chunk = file.read(READ_SIZE)
+        finished = not chunk
+        buffer = buffer[position:] + chunk
+        position = 0
+
+
+@contextmanager
+def keep_timestamps(model):
+    """Не даёт auto_now и auto_now_add перезаписать даты из файла"""
+    fields = [
+        field for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now', False)
+        or getattr(field, 'auto_now_add', False)
+    ]
+    flags = [(field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield fields
+    finally:
+        for field, (auto_now, auto_now_add) in zip(fields, flags):
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+def batched(iterable, size):
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def reset_sequences(models):
+    """Сдвигает счётчики id после вставки строк с явными id"""
+    with connection.cursor() as cursor:
+        for sql in connection.ops.sequence_reset_sql(no_style(), models):
+            cursor.execute(sql)
+
+
+def get_model_path(directory, model):
+    """Файл выгрузки модели в каталоге: blog.post.jsonl.gz"""
+    return Path(directory) / (model._meta.label_lower + EXTENSION)
+
+
+def iter_records(path):
+    """
+    Записи фикстуры вида {"model": …, "pk": …, "fields": {…}}.
+
+    Поддерживаются фикстуры dumpdata (JSON-массив) и файлы с одной
+    записью в строке (.jsonl), в том числе сжатые gzip.
+    """
+    with open_text(path) as file:
+        if is_json_lines(path):
+            for line in file:
+                if line.strip():
+                    yield json.loads(line)
+        else:
+            yield from _iter_array(file)
+
+
+def iter_model_records(model, chunk_size, field_names=None):
+    """
+    Строки модели в формате фикстуры, порциями по первичному ключу.
+
+    Каждая порция — отдельный запрос values() с pk > последнего,
+    поэтому память не растёт с размером таблицы. field_names
+    ограничивает выгружаемые поля, по умолчанию выгружаются все.
+    Связи «многие ко многим» не выгружаются.
+    """
+    label = model._meta.label_lower
+    pk = model._meta.pk.attname
+    fields = [
+        field for field in model._meta.concrete_fields
+        if not field.primary_key
+        and (field_names is None or field.name in field_names)
+    ]
+    queryset = model._default_manager.order_by(pk).values(
+        pk, *(field.attname for field in fields)
+    )
+    last_pk = None
+    while True:
+        chunk = queryset if last_pk is None else queryset.filter(
+            **{f'{pk}__gt': last_pk}
+        )
+        rows = list(chunk[:chunk_size])
+        for row in rows:
+            yield {
+                'model': label,
+                'pk': row[pk],
+                'fields': {
+                    field.name: row[field.attname] for field in fields
+                },
+            }
+        if len(rows) < chunk_size:
+            return
+        last_pk = rows[-1][pk]
+
+
+def write_records(path, records):
+    """
+    Пишет записи по одной в строке и подменяет файл только целиком.
+
+    Возвращает количество записей.
+    """
+    path = Path(path)
+    temp = path.with_name(path.name + '.tmp')
+    count = 0
+    encoder = RecordEncoder(ensure_ascii=False)
+    compressed = path.name.endswith('.gz')
+    with open_text(temp, 'wt', compressed) as file:
+        for record in records:
+            file.write(encoder.encode(record) + '\n')
+            count += 1
+    os.replace(temp, path)
+    return count
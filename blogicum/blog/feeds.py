@@ -0,0 +1,173 @@
+import hashlib
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.syndication.views import Feed
+from django.core.cache import cache
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.utils.cache import get_conditional_response
+from django.utils.feedgenerator import Atom1Feed
+from django.utils.html import linebreaks
+from django.utils.http import parse_http_date_safe, quote_etag
+
+from .caching import cap_timeout, get_version, get_visibility_horizon
+from .models import Category
+from .utils import get_filter_posts
+
+User = get_user_model()
+
+
+class CachedFeedMixin:
+    """
+    Миксин, который кеширует ленту целиком и отвечает на условные GET.
+
+    Лента строится только из видимых постов, а все записи, влияющие на
+    их видимость (посты и категории), меняют версию «posts». ETag
+    считается по этой версии, горизонту видимости и адресу ленты,
+    поэтому повторный опрос
+    без изменений обходится без запросов к базе. Прочие изменения,
+    например имени автора, попадут в ленту через FEED_CACHE_TIMEOUT.
+    """
+
+    def get_etag(self, request):
+        # Горизонт видимости меняется, когда отложенный пост становится
+        # видимым, и вместе с ним меняется ETag.
+        # Ссылки в ленте абсолютные, поэтому ключ зависит и от хоста
+        key = '{}:{}:{}:{}:{}'.format(
+            get_version('posts'), get_visibility_horizon(),
+            type(self).__name__, request.get_host(), request.path,
+        )
+        return quote_etag(hashlib.md5(key.encode()).hexdigest())
+
+    def __call__(self, request, *args, **kwargs):
+        etag = self.get_etag(request)
+        response = get_conditional_response(request, etag=etag)
+        if response is not None:
+            return response
+        key = f'blog:feed:{etag}'
+        response = cache.get(key)
+        if response is None:
+            response = super().__call__(request, *args, **kwargs)
+            response['ETag'] = etag
+            cache.set(
+                key, response, cap_timeout(settings.FEED_CACHE_TIMEOUT)
+            )
+        return get_conditional_response(
+            request,
+            etag=etag,
+            last_modified=parse_http_date_safe(
+                response.get('Last-Modified', '')
+            ),
+            response=response,
+        )
+
+
+class LatestPostsFeed(CachedFeedMixin, Feed):
+    """Последние публикации блога"""
+
+    title = 'Блогикум'
+    description = 'Новые публикации в Блогикуме'
+
+    def link(self):
+        return reverse('blog:index')
+
+    def get_posts(self, obj):
+        return get_filter_posts()
+
+    def items(self, obj):
+        return self.get_posts(obj)[:settings.FEED_ITEMS]
+
+    def get_feed(self, obj, request):
+        feed = super().get_feed(obj, request)
+        # Feed дописывает домен к ссылкам записей, но не к ссылке
+        # на автора
+        for item in feed.items:
+            if item['author_link']:
+                item['author_link'] = request.build_absolute_uri(
+                    item['author_link']
+                )
+        return feed
+
+    def item_title(self, item):
+        return item.title
+
+    def item_description(self, item):
+        return linebreaks(item.text, autoescape=True)
+
+    def item_link(self, item):
+        return item.get_absolute_url()
+
+    def item_pubdate(self, item):
+        return item.pub_date
+
+    def item_updateddate(self, item):
+        return item.updated_at
+
+    def item_author_name(self, item):
+        return item.author.get_full_name() or item.author.username
+
+    def item_author_link(self, item):
+        return reverse('blog:profile', args=(item.author.username,))
+
+    def item_categories(self, item):
+        return (item.category.title,) if item.category else ()
+
+
+class LatestPostsAtomFeed(LatestPostsFeed):
+    feed_type = Atom1Feed
+    subtitle = LatestPostsFeed.description
+
+
+class CategoryFeed(LatestPostsFeed):
+    """Последние публикации категории"""
+
+    def get_object(self, request, category_slug):
+        return get_object_or_404(
+            Category, slug=category_slug, is_published=True
+        )
+
+    def title(self, obj):
+        return f'Блогикум: {obj.title}'
+
+    def description(self, obj):
+        return obj.description
+
+    def link(self, obj):
+        return reverse('blog:category_posts', args=(obj.slug,))
+
+    def get_posts(self, obj):
+        return get_filter_posts().filter(category=obj)
+
+
+class CategoryAtomFeed(CategoryFeed):
+    feed_type = Atom1Feed
+
+    def subtitle(self, obj):
+        return obj.description
+
+
+class AuthorFeed(LatestPostsFeed):
+    """Последние публикации автора"""
+
+    def get_object(self, request, username):
+        return get_object_or_404(User, username=username)
+
+    def title(self, obj):
+        return f'Блогикум: @{obj.username}'
+
+    def description(self, obj):
+        return f'Публикации пользователя @{obj.username}'
+
+    def link(self, obj):
+        return reverse('blog:profile', args=(obj.username,))
+
+    def get_posts(self, obj):
+        return get_filter_posts().filter(author=obj)
+
+
+class AuthorAtomFeed(AuthorFeed):
+    feed_type = Atom1Feed
+
+    def subtitle(self, obj):
+        return self.description(obj)
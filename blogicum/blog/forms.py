@@ -1,16 +1,29 @@
 from django import forms
 from django.utils import timezone
 
+from .autocomplete import is_large
 from .models import Post, Comment
+from .widgets import AutocompleteSelect
 
 
 class PostForm(forms.ModelForm):
 
+    autocomplete_fields = ('location', 'category')
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.fields['pub_date'].initial = timezone.localtime(
             timezone.now()
         ).strftime('%Y-%m-%dT%H:%M')
+        for name in self.autocomplete_fields:
+            field = self.fields[name]
+            if is_large(field.queryset.model):
+                field.widget = AutocompleteSelect(
+                    name, attrs=field.widget.attrs
+                )
+                # Итератор вариантов, а не их список: строки таблицы
+                # выбираются только для уже выбранного значения
+                field.widget.choices = field.choices
 
     class Meta:
         model = Post
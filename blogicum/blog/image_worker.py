@@ -0,0 +1,57 @@
+import os
+import tempfile
+
+from PIL import Image, ImageOps, features
+
+# Модуль выполняется в процессах пула и не должен импортировать Django
+
+EXTENSIONS = {'webp': 'webp', 'jpeg': 'jpg'}
+
+
+def get_variant_path(source, width, image_format):
+    stem, _ = os.path.splitext(source)
+    return f'{stem}.{width}w.{EXTENSIONS[image_format]}'
+
+
+def save_atomic(image, path, image_format, quality):
+    """
+    Сохраняет картинку через уникальный временный файл: одну и ту же
+    копию могут одновременно создавать несколько процессов.
+    """
+    fd, temp = tempfile.mkstemp(
+        dir=os.path.dirname(path) or '.', suffix='.tmp'
+    )
+    try:
+        with os.fdopen(fd, 'wb') as file:
+            image.save(file, format=image_format.upper(), quality=quality)
+        os.chmod(temp, 0o644)
+        os.replace(temp, path)
+    except BaseException:
+        os.unlink(temp)
+        raise
+
+
+def render_variants(source_path, widths, formats, quality):
+    """
+    Сохраняет рядом с исходной картинкой уменьшенные копии.
+
+    Копии не бывают шире оригинала. Возвращает словарь
+    {формат: [ширины]} для созданных файлов.
+    """
+    variants = {}
+    with Image.open(source_path) as original:
+        image = ImageOps.exif_transpose(original)
+        targets = sorted({min(width, image.width) for width in widths})
+        for image_format in formats:
+            if image_format == 'webp' and not features.check('webp'):
+                continue
+            variants[image_format] = []
+            for width in targets:
+                height = max(round(image.height * width / image.width), 1)
+                variant = image.resize((width, height), Image.LANCZOS)
+                if image_format == 'jpeg' and variant.mode != 'RGB':
+                    variant = variant.convert('RGB')
+                path = get_variant_path(source_path, width, image_format)
+                save_atomic(variant, path, image_format, quality)
+                variants[image_format].append(width)
+    return variants
@@ -0,0 +1,174 @@
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .caching import bump_versions
+from .image_worker import get_variant_path, render_variants
+from .models import Post, StoredImage
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+
+
+def get_executor():
+    """Пул процессов для обработки картинок, создаётся при первом вызове"""
+    global _executor
+    if _executor is None:
+        # spawn: дочерние процессы не наследуют потоки и соединения
+        # с базой процесса веб-сервера
+        _executor = ProcessPoolExecutor(
+            max_workers=settings.IMAGE_WORKERS,
+            mp_context=multiprocessing.get_context('spawn'),
+        )
+    return _executor
+
+
+def get_variants(post, image_format):
+    """Пары (url, ширина) готовых копий картинки поста"""
+    variants = post.image_variants or {}
+    if not post.image or variants.get('source') != post.image.name:
+        return []
+    storage = post.image.storage
+    return [
+        (storage.url(get_variant_path(post.image.name, width, image_format)),
+         width)
+        for width in variants.get(image_format, ())
+    ]
+
+
+def store_variants(pk, name, variants):
+    """Запоминает готовые копии, если картинку поста не успели заменить"""
+    updated = Post.objects.filter(pk=pk, image=name).update(
+        image_variants={'source': name, **variants},
+        updated_at=timezone.now(),
+    )
+    if updated:
+        bump_versions(f'post:{pk}', 'content')
+
+
+def _variants_done(pk, name, future):
+    # Вызывается в служебном потоке пула со своим соединением с базой
+    try:
+        store_variants(pk, name, future.result())
+    except Exception:
+        logger.exception('Не удалось обработать картинку %s', name)
+    finally:
+        close_old_connections()
+
+
+def schedule_variants(post):
+    """
+    Ставит в очередь создание копий картинки поста после коммита.
+
+    При settings.IMAGE_WORKERS = 0 копии создаются сразу в текущем
+    процессе, например в тестах и management-командах.
+    """
+    pk = post.pk
+    name = post.image.name
+    args = (
+        post.image.path,
+        settings.IMAGE_VARIANT_WIDTHS,
+        settings.IMAGE_VARIANT_FORMATS,
+        settings.IMAGE_VARIANT_QUALITY,
+    )
+
+    def submit():
+        if not os.path.exists(args[0]):
+            return
+        # Такую же картинку уже обработали для другого поста
+        ready = Post.objects.filter(
+            image=name, image_variants__source=name
+        ).exclude(pk=pk).values_list('image_variants', flat=True).first()
+        if ready:
+            ready.pop('source')
+            store_variants(pk, name, ready)
+            return
+        if not settings.IMAGE_WORKERS:
+            try:
+                store_variants(pk, name, render_variants(*args))
+            except Exception:
+                logger.exception('Не удалось обработать картинку %s', name)
+            return
+        future = get_executor().submit(render_variants, *args)
+        future.add_done_callback(partial(_variants_done, pk, name))
+
+    transaction.on_commit(submit)
+
+
+def count_reference(name, delta=0):
+    """
+    Прибавляет delta к счётчику ссылок на файл, создавая строку при
+    необходимости, и возвращает новое значение.
+
+    Одна команда INSERT … ON CONFLICT (SQLite и PostgreSQL) блокирует
+    строку счётчика, а в SQLite — всю базу, до конца транзакции, так
+    что claim_image() и delete_unused_image() для одного файла
+    выполняются по очереди.
+    """
+    quote = connection.ops.quote_name
+    table = quote(StoredImage._meta.db_table)
+    references = quote('references')
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'INSERT INTO {table} ({quote("name")}, {references}) '
+            f'VALUES (%s, %s) ON CONFLICT ({quote("name")}) DO UPDATE '
+            f'SET {references} = {table}.{references} + %s '
+            f'RETURNING {references}',
+            [name, delta, delta],
+        )
+        return cursor.fetchone()[0]
+
+
+def claim_image(name):
+    """
+    Учитывает новую ссылку на файл; хранилище вызывает её до проверки,
+    есть ли файл на диске.
+    """
+    count_reference(name, 1)
+
+
+def unclaim_image(name):
+    """Снимает ссылку в текущей транзакции, не удаляя файл"""
+    StoredImage.objects.filter(name=name, references__gt=0).update(
+        references=F('references') - 1
+    )
+
+
+def delete_unused_image(name):
+    """
+    Удаляет файл картинки и его копии, если на него не осталось ссылок.
+
+    Строки счётчика может не быть у постов, загруженных в обход
+    хранилища (import_blog_data), поэтому проверяются и сами посты.
+    """
+    storage = Post._meta.get_field('image').storage
+    with transaction.atomic():
+        if count_reference(name) or Post.objects.filter(image=name).exists():
+            return
+        directory, filename = os.path.split(name)
+        prefix = os.path.splitext(filename)[0] + '.'
+        try:
+            _, files = storage.listdir(directory)
+        except FileNotFoundError:
+            files = []
+        for file in files:
+            if file.startswith(prefix):
+                storage.delete(os.path.join(directory, file))
+        StoredImage.objects.filter(name=name).delete()
+
+
+def release_image(name):
+    """
+    Снимает ссылку на файл в текущей транзакции и после коммита
+    удаляет файл, если он больше никому не нужен.
+    """
+    unclaim_image(name)
+    transaction.on_commit(partial(delete_unused_image, name))
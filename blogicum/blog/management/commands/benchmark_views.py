@@ -0,0 +1,125 @@
+import json
+import platform
+from pathlib import Path
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+from django.utils import timezone
+
+from blog import benchmarks
+from blog.datafiles import MODELS
+
+
+class Command(BaseCommand):
+    help = (
+        'Замеряет задержку (p50/p95/p99), число SQL-запросов и размер '
+        'ответа для всех маршрутов блога на текущей базе'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--requests', type=int, default=50,
+            help='Количество замеряемых запросов к каждому маршруту.'
+        )
+        parser.add_argument(
+            '--warmup', type=int, default=3,
+            help='Количество запросов для прогрева перед замером.'
+        )
+        parser.add_argument(
+            '--only', action='append',
+            help='Мерить только маршруты, в имени которых есть строка.'
+        )
+        parser.add_argument(
+            '--output', help='Сохранить результаты в JSON-файл.'
+        )
+        parser.add_argument(
+            '--compare', metavar='BASELINE',
+            help='Сравнить с результатами прежнего прогона.'
+        )
+        parser.add_argument(
+            '--load', metavar='RESULTS',
+            help='Взять результаты из файла вместо нового прогона.'
+        )
+        parser.add_argument(
+            '--threshold', type=float, default=0.1,
+            help='Допустимый рост p95 в долях, по умолчанию 10%%.'
+        )
+
+    def handle(self, *args, **options):
+        if options['load']:
+            report = self.read(options['load'])
+        else:
+            report = self.run(options)
+        self.print_results(report['results'])
+        if options['output']:
+            Path(options['output']).write_text(
+                json.dumps(report, ensure_ascii=False, indent=2),
+                encoding='utf-8',
+            )
+        if options['compare']:
+            self.check_regressions(
+                self.read(options['compare'])['results'],
+                report['results'], options['threshold'],
+            )
+
+    def read(self, path):
+        try:
+            return json.loads(Path(path).read_text(encoding='utf-8'))
+        except (OSError, ValueError) as error:
+            raise CommandError(f'Не удалось прочитать {path}: {error}')
+
+    def run(self, options):
+        if options['requests'] < 1 or options['warmup'] < 0:
+            raise CommandError('Неверное количество запросов.')
+        # Тестовый клиент обращается к хосту testserver; превышение
+        # бюджета запросов должно попасть в отчёт, а не прервать замер
+        with override_settings(
+            ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver'],
+            QUERY_BUDGET_RAISE=False,
+        ):
+            results = benchmarks.run(
+                options['requests'], options['warmup'], options['only']
+            )
+        if results is None:
+            raise CommandError(
+                'В базе нет видимых постов; создайте данные командой '
+                'generate_blog_data.'
+            )
+        return {
+            'meta': {
+                'created_at': timezone.now().isoformat(),
+                'requests': options['requests'],
+                'warmup': options['warmup'],
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'database': settings.DATABASES['default']['ENGINE'],
+                'rows': {
+                    model._meta.label_lower: model.objects.count()
+                    for model in MODELS
+                },
+            },
+            'results': results,
+        }
+
+    def print_results(self, results):
+        self.stdout.write('{:<40} {:>6} {:>9} {:>9} {:>9} {:>5} {:>9}'.format(
+            'маршрут', 'код', 'p50, мс', 'p95, мс', 'p99, мс', 'SQL', 'байт'
+        ))
+        for label, result in results.items():
+            self.stdout.write(
+                '{:<40} {:>6} {:>9.1f} {:>9.1f} {:>9.1f} {:>5} {:>9}'.format(
+                    label, result['status'], result['p50_ms'],
+                    result['p95_ms'], result['p99_ms'], result['queries'],
+                    result['bytes'],
+                )
+            )
+
+    def check_regressions(self, baseline, results, threshold):
+        regressions = benchmarks.compare(baseline, results, threshold)
+        for label, problems in regressions:
+            self.stderr.write(f'{label}: ' + '; '.join(problems))
+        if regressions:
+            raise CommandError(f'Регрессий: {len(regressions)}.')
+        self.stdout.write(self.style.SUCCESS('Регрессий не найдено.'))
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from blog.sitemaps import refresh_sitemaps
+
+
+class Command(BaseCommand):
+    help = 'Перестраивает изменившиеся шарды карты сайта и её индекс'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--force', action='store_true',
+            help='Перестроить все шарды независимо от отпечатков.'
+        )
+
+    def handle(self, *args, force, **options):
+        changed = refresh_sitemaps(force=force)
+        if changed is None:
+            self.stdout.write(
+                'Карту сайта уже перестраивает другой процесс.'
+            )
+            return
+        self.stdout.write(self.style.SUCCESS(
+            f'Обновлено файлов карты сайта: {len(changed)}.'
+        ))
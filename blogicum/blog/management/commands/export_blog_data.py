@@ -0,0 +1,60 @@
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from blog.datafiles import (
+    MODELS, USER_FIELDS, get_model_path, iter_model_records, write_records
+)
+
+User = MODELS[0]
+
+
+class Command(BaseCommand):
+    help = (
+        'Выгружает пользователей, категории, местоположения, посты и '
+        'комментарии в сжатые файлы JSON Lines, по файлу на модель'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'directory', help='Каталог для файлов выгрузки.'
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=2000,
+            help='Количество строк, читаемых из базы за один запрос.'
+        )
+        parser.add_argument(
+            '--include-credentials', action='store_true',
+            help=(
+                'Выгрузить пользователей целиком, с хешами паролей, '
+                'почтой и правами.'
+            )
+        )
+
+    def handle(self, *args, directory, chunk_size, include_credentials,
+               **options):
+        if chunk_size < 1:
+            raise CommandError('--chunk-size должен быть положительным.')
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        started = time.monotonic()
+        total = 0
+        for model in MODELS:
+            model_started = time.monotonic()
+            path = get_model_path(directory, model)
+            fields = None
+            if model is User and not include_credentials:
+                fields = USER_FIELDS
+            count = write_records(
+                path, iter_model_records(model, chunk_size, fields)
+            )
+            total += count
+            elapsed = time.monotonic() - model_started
+            self.stdout.write(
+                f'{path.name}: {count} строк за {elapsed:.1f} с.'
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f'Выгружено строк: {total} '
+            f'за {time.monotonic() - started:.1f} с.'
+        ))
@@ -0,0 +1,263 @@
+import random
+import time
+from datetime import timedelta
+from itertools import accumulate
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+from faker import Faker
+
+from blog.caching import LOCAL_CACHE_WARNING, invalidate_dataset
+from blog.datafiles import MODELS, batched, keep_timestamps, reset_sequences
+from blog.models import Category, Comment, Location, Post
+
+User = MODELS[0]
+
+# Количество постов для каждого масштаба
+SCALES = {'10k': 10_000, '1m': 1_000_000, '10m': 10_000_000}
+HISTORY = timedelta(days=5 * 365)
+FUTURE = timedelta(days=30)
+# Размер пулов текста: Faker медленный, строки собираются из готовых фраз
+POOL_SIZE = 2000
+MAX_COMMENTS = 500
+
+
+def get_cum_weights(size, exponent=1.0):
+    """Накопленные веса распределения Ципфа: первые элементы популярнее"""
+    return list(accumulate(1 / (rank + 1) ** exponent for rank in range(size)))
+
+
+class Command(BaseCommand):
+    help = (
+        'Создаёт синтетических пользователей, категории, местоположения, '
+        'посты и комментарии; одинаковый --seed даёт одинаковые данные'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--scale', choices=SCALES, default='10k',
+            help='Масштаб по количеству постов.'
+        )
+        parser.add_argument(
+            '--posts', type=int,
+            help='Точное количество постов вместо --scale.'
+        )
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--batch-size', type=int, default=5000,
+            help='Количество строк, записываемых за одну транзакцию.'
+        )
+
+    def handle(self, *args, scale, posts, seed, batch_size, **options):
+        posts = SCALES[scale] if posts is None else posts
+        if posts < 1 or batch_size < 1:
+            raise CommandError(
+                'Количество постов и --batch-size должны быть положительными.'
+            )
+        self.random = random.Random(seed)
+        fake = Faker('ru_RU')
+        fake.seed_instance(seed)
+        self.sentences = [fake.sentence() for _ in range(POOL_SIZE)]
+        self.titles = [
+            fake.sentence(nb_words=4).rstrip('.') for _ in range(POOL_SIZE)
+        ]
+        self.user_names = [fake.user_name() for _ in range(POOL_SIZE)]
+        self.cities = [fake.city() for _ in range(POOL_SIZE)]
+        self.words = fake.words(POOL_SIZE, unique=False)
+        # Даты отсчитываются от начала дня, чтобы повторный запуск
+        # в тот же день давал те же строки
+        self.now = timezone.now().replace(
+            hour=0, minute=0, second=0, microsecond=0
+        )
+        self.password = make_password(None)
+        self.batch_size = batch_size
+        started = time.monotonic()
+        self.user_ids = self.insert(
+            User, self.generate_user, max(10, posts // 20)
+        )
+        self.category_ids = self.insert(
+            Category, self.generate_category, max(5, posts // 2000)
+        )
+        self.location_ids = self.insert(
+            Location, self.generate_location, max(10, posts // 500)
+        )
+        total = sum(map(len, (
+            self.user_ids, self.category_ids, self.location_ids
+        ))) + self.insert_posts(posts)
+        reset_sequences(MODELS)
+        if not invalidate_dataset():
+            self.stderr.write(LOCAL_CACHE_WARNING)
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Создано строк: {total} за {elapsed:.1f} с '
+            f'({total / max(elapsed, 1e-6):.0f} строк/с).'
+        ))
+
+    def get_first_id(self, model):
+        return (model.objects.aggregate(last=Max('pk'))['last'] or 0) + 1
+
+    def write(self, model, objects):
+        with keep_timestamps(model), transaction.atomic():
+            model.objects.bulk_create(objects, batch_size=self.batch_size)
+
+    def insert(self, model, generate, count):
+        """Создаёт count строк модели с id подряд и возвращает эти id"""
+        started = time.monotonic()
+        first_id = self.get_first_id(model)
+        ids = range(first_id, first_id + count)
+        for batch in batched(ids, self.batch_size):
+            self.write(model, [generate(pk) for pk in batch])
+        self.report(model, count, started)
+        return ids
+
+    def report(self, model, count, started):
+        elapsed = time.monotonic() - started
+        self.stdout.write(
+            f'{model._meta.label_lower}: {count} за {elapsed:.1f} с '
+            f'({count / max(elapsed, 1e-6):.0f} строк/с).'
+        )
+
+    def past_date(self, period=HISTORY):
+        return self.now - timedelta(
+            seconds=self.random.randrange(int(period.total_seconds()))
+        )
+
+    def generate_user(self, pk):
+        username = f'{self.random.choice(self.user_names)}{pk}'
+        return User(
+            pk=pk,
+            username=username,
+            email=f'{username}@example.com',
+            password=self.password,
+            date_joined=self.past_date(),
+        )
+
+    def generate_category(self, pk):
+        created_at = self.past_date()
+        return Category(
+            pk=pk,
+            title=' '.join(self.random.sample(self.words, 2)).capitalize(),
+            slug=f'category-{pk}',
+            description=self.random.choice(self.sentences),
+            is_published=self.random.random() < 0.9,
+            created_at=created_at,
+            updated_at=created_at,
+        )
+
+    def generate_location(self, pk):
+        created_at = self.past_date()
+        return Location(
+            pk=pk,
+            name=self.random.choice(self.cities),
+            is_published=self.random.random() < 0.9,
+            created_at=created_at,
+            updated_at=created_at,
+        )
+
+    def choose(self, ids, cum_weights, count):
+        """Выбирает count id со смещением к первым, как у популярных авторов"""
+        return [
+            ids[index] for index in self.random.choices(
+                range(len(ids)), cum_weights=cum_weights, k=count
+            )
+        ]
+
+    def insert_posts(self, count):
+        """
+        Посты и их комментарии: у большинства постов комментариев
+        мало, у немногих — сотни (распределение Парето).
+        """
+        started = time.monotonic()
+        published_categories = set(Category.objects.filter(
+            is_published=True,
+            pk__range=(self.category_ids[0], self.category_ids[-1]),
+        ).values_list('pk', flat=True))
+        user_weights = get_cum_weights(len(self.user_ids), 0.8)
+        category_weights = get_cum_weights(len(self.category_ids))
+        location_weights = get_cum_weights(len(self.location_ids), 0.5)
+        first_id = self.get_first_id(Post)
+        comment_id = self.get_first_id(Comment)
+        comments_total = 0
+        for batch in batched(
+                range(first_id, first_id + count), self.batch_size):
+            authors = self.choose(self.user_ids, user_weights, len(batch))
+            categories = self.choose(
+                self.category_ids, category_weights, len(batch)
+            )
+            locations = self.choose(
+                self.location_ids, location_weights, len(batch)
+            )
+            posts, comments = [], []
+            for index, pk in enumerate(batch):
+                post = self.generate_post(
+                    pk, authors[index], categories[index], locations[index],
+                    published_categories,
+                )
+                for _ in range(post.comment_count):
+                    comments.append(self.generate_comment(
+                        comment_id, post, user_weights
+                    ))
+                    comment_id += 1
+                posts.append(post)
+            self.write(Post, posts)
+            self.write(Comment, comments)
+            comments_total += len(comments)
+        self.report(Post, count, started)
+        self.stdout.write(f'blog.comment: {comments_total}.')
+        return count + comments_total
+
+    def generate_post(self, pk, author_id, category_id, location_id,
+                      published_categories):
+        rand = self.random.random
+        if rand() < 0.01:
+            category_id = None
+        if rand() < 0.5:
+            location_id = None
+        is_published = rand() < 0.95
+        if rand() < 0.03:
+            # Отложенная публикация
+            pub_date = self.now + timedelta(
+                seconds=self.random.randrange(int(FUTURE.total_seconds()))
+            )
+            created_at = self.past_date(FUTURE)
+        else:
+            pub_date = self.past_date()
+            created_at = pub_date
+        comment_count = 0
+        if is_published and pub_date <= self.now:
+            comment_count = min(
+                int(self.random.paretovariate(1.2)) - 1, MAX_COMMENTS
+            )
+        return Post(
+            pk=pk,
+            title=self.random.choice(self.titles),
+            text=' '.join(
+                self.random.sample(self.sentences, self.random.randint(3, 12))
+            ),
+            pub_date=pub_date,
+            author_id=author_id,
+            category_id=category_id,
+            location_id=location_id,
+            is_published=is_published,
+            is_visible=is_published and category_id in published_categories,
+            comment_count=comment_count,
+            created_at=created_at,
+            updated_at=created_at,
+        )
+
+    def generate_comment(self, pk, post, user_weights):
+        age = self.now - post.pub_date
+        created_at = post.pub_date + timedelta(
+            seconds=self.random.randrange(max(int(age.total_seconds()), 1))
+        )
+        return Comment(
+            pk=pk,
+            post_id=post.pk,
+            author_id=self.choose(self.user_ids, user_weights, 1)[0],
+            text=self.random.choice(self.sentences),
+            is_published=self.random.random() < 0.98,
+            created_at=created_at,
+        )
@@ -0,0 +1,213 @@
+import os
+import time
+
+from django.contrib.auth.hashers import make_password
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.core.serializers.python import Deserializer
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.utils import timezone
+
+from blog.caching import LOCAL_CACHE_WARNING, invalidate_dataset
+from blog.datafiles import (
+    MODELS, batched, get_model_path, iter_records, keep_timestamps,
+    reset_sequences,
+)
+from blog.models import Category, Comment, Post, StoredImage
+
+User = MODELS[0]
+
+
+class Command(BaseCommand):
+    help = (
+        'Загружает пользователей, категории, местоположения, посты '
+        'и комментарии из фикстуры dumpdata, файла .jsonl(.gz) или '
+        'каталога выгрузки export_blog_data'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'path', help='Путь к файлу данных или каталогу выгрузки.'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=2000,
+            help='Количество строк, записываемых за одну транзакцию.'
+        )
+        parser.add_argument(
+            '--clear', action='store_true',
+            help='Удалить существующие данные перед загрузкой.'
+        )
+
+    def handle(self, *args, path, batch_size, clear, **options):
+        if batch_size < 1:
+            raise CommandError('--batch-size должен быть положительным.')
+        if clear:
+            self.clear()
+        self.ids = {}
+        self.published_categories = set()
+        started = time.monotonic()
+        try:
+            loaded = {
+                model: self.load_model(model, path, batch_size)
+                for model in MODELS
+            }
+            if loaded[Comment]:
+                call_command(
+                    'recount_comments', batch_size=batch_size,
+                    stdout=self.stdout,
+                )
+            reset_sequences(MODELS)
+        finally:
+            # Очищенные или частично загруженные данные тоже меняют кеши
+            if not invalidate_dataset():
+                self.stderr.write(LOCAL_CACHE_WARNING)
+        total = sum(loaded.values())
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Загружено строк: {total} за {elapsed:.1f} с '
+            f'({total / max(elapsed, 1e-6):.0f} строк/с).'
+        ))
+
+    def clear(self):
+        """
+        Удаляет прежние данные одной транзакцией: таблицы блога —
+        командами очистки из connection.ops.sql_flush() (TRUNCATE в
+        PostgreSQL), пользователей — кроме персонала и суперпользователей.
+
+        Выгрузка по умолчанию не содержит паролей, поэтому без прежних
+        учётных записей администраторы не смогли бы войти. Сигналы
+        удаления не отправляются: пересчитывать счётчики незачем,
+        а файлы картинок могут понадобиться загружаемым постам. Кеши
+        сбрасывает invalidate_dataset() в конце загрузки. Счётчики
+        ссылок на картинки очищаются вместе с постами, а файлы
+        загруженных постов защищает проверка ссылок в release_image().
+        """
+        tables = [
+            model._meta.db_table
+            for model in (*MODELS, StoredImage) if model is not User
+        ]
+        with transaction.atomic():
+            statements = connection.ops.sql_flush(
+                no_style(), tables, allow_cascade=True
+            )
+            with connection.cursor() as cursor:
+                for statement in statements:
+                    cursor.execute(statement)
+            User.objects.filter(is_staff=False, is_superuser=False).delete()
+        kept = User.objects.count()
+        if kept:
+            self.stdout.write(
+                f'Сохранены учётные записи персонала: {kept}.'
+            )
+
+    def load_model(self, model, path, batch_size):
+        """
+        Один проход по файлу: строки модели пишутся через bulk_create.
+
+        Внешние ключи проверяются по множествам id уже загруженных
+        моделей, без запросов на каждую строку. Строки с занятыми
+        первичными ключами или уникальными значениями пропускаются,
+        а ссылки на их id не считаются ссылками на прежние строки базы
+        с теми же id: это другие объекты.
+        """
+        label = model._meta.label_lower
+        records = self.get_records(model, path)
+        started = time.monotonic()
+        read = skipped = 0
+        conflicts = set()
+        with keep_timestamps(model) as timestamps:
+            objects = (
+                self.prepare(item.object, timestamps)
+                for item in Deserializer(records, ignorenonexistent=True)
+            )
+            for batch in batched(objects, batch_size):
+                read += len(batch)
+                valid = [obj for obj in batch if obj is not None]
+                pks = {obj.pk for obj in valid if obj.pk is not None}
+                with transaction.atomic():
+                    existing = self.get_existing(model, pks)
+                    model.objects.bulk_create(
+                        valid, batch_size=batch_size, ignore_conflicts=True
+                    )
+                    inserted = self.get_existing(model, pks) - existing
+                if model is User:
+                    inserted |= self.get_same_users(valid, pks - inserted)
+                conflicts |= pks - inserted
+                skipped += len(batch) - len(valid) + len(pks - inserted)
+        # Прежние строки базы остаются доступны для ссылок, кроме тех,
+        # чьи id заняты строками файла, которые не удалось вставить
+        self.ids[model] = set(
+            model.objects.values_list('pk', flat=True)
+        ) - conflicts
+        if model is Category:
+            self.published_categories = set(
+                Category.objects.filter(is_published=True)
+                .values_list('pk', flat=True)
+            )
+        elapsed = time.monotonic() - started
+        self.stdout.write(
+            f'{label}: прочитано {read}, пропущено {skipped} '
+            f'за {elapsed:.1f} с ({read / max(elapsed, 1e-6):.0f} строк/с).'
+        )
+        return read
+
+    def get_same_users(self, users, pks):
+        """
+        Id пользователей файла, которые уже есть в базе с тем же
+        именем, например персонал, сохранённый при --clear.
+        """
+        names = {user.pk: user.username for user in users}
+        return {
+            pk for pk, username in User.objects.filter(
+                pk__in=pks
+            ).values_list('pk', 'username')
+            if names.get(pk) == username
+        }
+
+    def get_existing(self, model, pks):
+        return set(
+            model.objects.filter(pk__in=pks).values_list('pk', flat=True)
+        )
+
+    def get_records(self, model, path):
+        if os.path.isdir(path):
+            model_path = get_model_path(path, model)
+            return iter_records(model_path) if model_path.exists() else ()
+        label = model._meta.label_lower
+        return (
+            record for record in iter_records(path)
+            if record['model'] == label
+        )
+
+    def prepare(self, obj, timestamps):
+        """
+        Сверяет внешние ключи с загруженными id и заполняет поля,
+        которые обычно выставляют сигналы и auto_now.
+
+        Возвращает None, если строку загрузить нельзя.
+        """
+        # Недостающая дата изменения совпадает с датой создания
+        default = getattr(obj, 'created_at', None) or timezone.now()
+        for field in timestamps:
+            if getattr(obj, field.attname) is None:
+                setattr(obj, field.attname, default)
+        for field in obj._meta.concrete_fields:
+            if not field.is_relation:
+                continue
+            value = getattr(obj, field.attname)
+            if value is None or value in self.ids[field.related_model]:
+                continue
+            if not field.null:
+                return None
+            setattr(obj, field.attname, None)
+        if isinstance(obj, User) and not obj.password:
+            # Выгрузка без паролей: войти можно после сброса пароля
+            obj.password = make_password(None)
+        if isinstance(obj, Post):
+            obj.is_visible = (
+                obj.is_published
+                and obj.category_id in self.published_categories
+            )
+            obj.comment_count = 0
+        return obj
@@ -0,0 +1,46 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count
+
+from blog.models import Comment, Post
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает денормализованные счётчики комментариев постов'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Количество постов, обрабатываемых за одну транзакцию.'
+        )
+
+    def handle(self, *args, batch_size, **options):
+        last_id = 0
+        processed = fixed = 0
+        while True:
+            with transaction.atomic():
+                posts = list(
+                    Post.objects.select_for_update()
+                    .filter(pk__gt=last_id).order_by('pk')
+                    .only('pk', 'comment_count')[:batch_size]
+                )
+                if not posts:
+                    break
+                counts = dict(
+                    Comment.objects.filter(post__in=posts)
+                    .order_by().values_list('post')
+                    .annotate(total=Count('pk'))
+                )
+                stale = []
+                for post in posts:
+                    actual = counts.get(post.pk, 0)
+                    if post.comment_count != actual:
+                        post.comment_count = actual
+                        stale.append(post)
+                Post.objects.bulk_update(stale, ['comment_count'])
+            processed += len(posts)
+            fixed += len(stale)
+            last_id = posts[-1].pk
+        self.stdout.write(self.style.SUCCESS(
+            f'Проверено постов: {processed}, исправлено: {fixed}.'
+        ))
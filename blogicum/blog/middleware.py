@@ -0,0 +1,154 @@
+import hashlib
+import logging
+import random
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.utils.cache import get_conditional_response
+
+from .caching import cap_timeout, get_version
+
+logger = logging.getLogger(__name__)
+
+
+class AnonymousPageCacheMiddleware:
+    """
+    Кеширует страницы целиком для анонимных посетителей.
+
+    Время жизни задаётся по имени маршрута в settings.PAGE_CACHE_TIMEOUTS
+    и для лент из settings.VISIBILITY_HORIZON_VIEWS не переходит момент
+    публикации ближайшего отложенного поста; записи сбрасываются сменой
+    версии «content» при изменении постов, комментариев, категорий
+    и местоположений.
+    """
+
+    cache_methods = ('GET', 'HEAD')
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        key = getattr(request, '_page_cache_key', None)
+        if key is not None and self.is_cacheable(response):
+            timeout = request._page_cache_timeout
+            if request.resolver_match.view_name in (
+                settings.VISIBILITY_HORIZON_VIEWS
+            ):
+                timeout = cap_timeout(timeout)
+            if timeout:
+                cache.set(key, response, timeout)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if request.method not in self.cache_methods:
+            return None
+        if request.user.is_authenticated:
+            return None
+        timeout = settings.PAGE_CACHE_TIMEOUTS.get(
+            request.resolver_match.view_name
+        )
+        if not timeout:
+            return None
+        key = self.get_cache_key(request)
+        response = cache.get(key)
+        if response is not None:
+            return get_conditional_response(
+                request, etag=response.get('ETag'), response=response
+            )
+        if request.method == 'GET':
+            request._page_cache_key = key
+            request._page_cache_timeout = timeout
+        return None
+
+    @staticmethod
+    def get_cache_key(request):
+        url = hashlib.md5(
+            request.build_absolute_uri().encode()
+        ).hexdigest()
+        return 'blog:page:{}:{}:{}'.format(
+            get_version('content'), request.resolver_match.view_name, url
+        )
+
+    @staticmethod
+    def is_cacheable(response):
+        return (
+            response.status_code == 200
+            and not response.streaming
+            and not response.cookies
+        )
+
+
+class QueryBudgetExceeded(Exception):
+    """Представление выполнило больше SQL-запросов, чем разрешено"""
+
+
+class QueryStats:
+    """Обёртка выполнения запросов, считающая их количество и время"""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+            self.count += 1
+
+
+class QueryBudgetMiddleware:
+    """
+    Следит за количеством и временем SQL-запросов на один запрос.
+
+    Лимиты задаются по имени маршрута в settings.QUERY_BUDGETS, общий
+    лимит времени — в settings.QUERY_TIME_BUDGET. Проверяется доля
+    запросов settings.QUERY_BUDGET_SAMPLE_RATE. Превышение лимита
+    количества пишется в лог или, при settings.QUERY_BUDGET_RAISE,
+    вызывает QueryBudgetExceeded; превышение времени только пишется
+    в лог.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if random.random() >= settings.QUERY_BUDGET_SAMPLE_RATE:
+            return self.get_response(request)
+        stats = QueryStats()
+        with connection.execute_wrapper(stats):
+            response = self.get_response(request)
+        self.check_budget(request, stats)
+        return response
+
+    def check_budget(self, request, stats):
+        match = request.resolver_match
+        view_name = match.view_name if match else None
+        logger.debug(
+            '%s %s: %d SQL-запросов, %.1f мс', request.method, view_name,
+            stats.count, stats.duration * 1000
+        )
+        budget = settings.QUERY_BUDGETS.get(
+            view_name, settings.QUERY_BUDGET_DEFAULT
+        )
+        time_budget = settings.QUERY_TIME_BUDGET
+        if time_budget is not None and stats.duration > time_budget:
+            # Время зависит от машины и объёма данных, поэтому только
+            # пишется в лог, даже при QUERY_BUDGET_RAISE
+            logger.warning(
+                'Превышен бюджет времени SQL: %s %s (%s): %.3f с '
+                'при лимите %s с', request.method, request.path,
+                view_name, stats.duration, time_budget
+            )
+        if budget is None or stats.count <= budget:
+            return
+        message = '{} {} ({}): {} SQL-запросов при лимите {}'.format(
+            request.method, request.path, view_name, stats.count, budget
+        )
+        if settings.QUERY_BUDGET_RAISE:
+            raise QueryBudgetExceeded(message)
+        logger.warning('Превышен бюджет запросов: %s', message)
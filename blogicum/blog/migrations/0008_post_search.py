@@ -0,0 +1,86 @@
+# Generated by Django 3.2.16 on 2026-10-18 03:55
+
+import blog.search
+from django.db import migrations, models
+import django.db.models.deletion
+
+TRIGGERS_SQL = (
+    "CREATE TRIGGER IF NOT EXISTS blog_post_fts_ai "
+    "AFTER INSERT ON blog_post BEGIN "
+    "INSERT INTO blog_post_fts(rowid, title, text) "
+    "VALUES (new.id, new.title, new.text); END",
+    "CREATE TRIGGER IF NOT EXISTS blog_post_fts_ad "
+    "AFTER DELETE ON blog_post BEGIN "
+    "INSERT INTO blog_post_fts(blog_post_fts, rowid, title, text) "
+    "VALUES ('delete', old.id, old.title, old.text); END",
+    # Счётчики и флаги поста меняются часто, индекс трогаем
+    # только при правке заголовка или текста.
+    "CREATE TRIGGER IF NOT EXISTS blog_post_fts_au "
+    "AFTER UPDATE OF title, text ON blog_post BEGIN "
+    "INSERT INTO blog_post_fts(blog_post_fts, rowid, title, text) "
+    "VALUES ('delete', old.id, old.title, old.text); "
+    "INSERT INTO blog_post_fts(rowid, title, text) "
+    "VALUES (new.id, new.title, new.text); END",
+)
+
+CREATE_SQL = (
+    # Внешнее содержимое: текст хранится только в blog_post,
+    # индекс держит лишь словарь и позиции слов.
+    "CREATE VIRTUAL TABLE blog_post_fts USING fts5("
+    "title, text, content='blog_post', content_rowid='id', "
+    "tokenize='unicode61 remove_diacritics 2')",
+    # Заголовок весит больше текста.
+    "INSERT INTO blog_post_fts(blog_post_fts, rank) "
+    "VALUES('rank', 'bm25(10.0, 1.0)')",
+    *TRIGGERS_SQL,
+    "INSERT INTO blog_post_fts(blog_post_fts) VALUES('rebuild')",
+)
+
+DROP_SQL = (
+    'DROP TRIGGER IF EXISTS blog_post_fts_au',
+    'DROP TRIGGER IF EXISTS blog_post_fts_ad',
+    'DROP TRIGGER IF EXISTS blog_post_fts_ai',
+    'DROP TABLE IF EXISTS blog_post_fts',
+)
+
+
+# SQLite теряет триггеры, когда миграция пересоздаёт таблицу blog_post
+# (например, при AddField); такие миграции должны выполнить TRIGGERS_SQL.
+def run_sqlite(statements):
+    def run(apps, schema_editor):
+        # FTS5 есть только в SQLite; на других СУБД поиск
+        # работает без индекса (см. blog.utils.search_posts).
+        if schema_editor.connection.vendor != 'sqlite':
+            return
+        for statement in statements:
+            schema_editor.execute(statement)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0007_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PostSearchIndex',
+            fields=[
+                ('post', models.OneToOneField(db_column='rowid', db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='search_index', serialize=False, to='blog.post')),
+                ('title', models.TextField(verbose_name='Заголовок')),
+                ('text', models.TextField(verbose_name='Текст')),
+                ('document', blog.search.SearchDocumentField(db_column='blog_post_fts')),
+                ('rank', models.FloatField(verbose_name='Релевантность')),
+            ],
+            options={
+                'verbose_name': 'поисковый индекс',
+                'verbose_name_plural': 'Поисковый индекс',
+                'db_table': 'blog_post_fts',
+                'managed': False,
+            },
+        ),
+        migrations.RunPython(
+            run_sqlite(CREATE_SQL), run_sqlite(DROP_SQL)
+        ),
+    ]
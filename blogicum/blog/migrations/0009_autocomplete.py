@@ -0,0 +1,102 @@
+# Generated by Django 3.2.16 on 2026-10-18 03:59
+
+import blog.search
+from django.conf import settings
+from django.db import migrations, models
+
+# Вид записи, модель, поле названия, поле видимости. rowid записи —
+# id объекта * 4 + номер вида, поэтому триггеры находят её без поиска.
+SOURCES = (
+    ('category', 1, 'blog.Category', 'title', 'is_published'),
+    ('location', 2, 'blog.Location', 'name', 'is_published'),
+    ('author', 3, settings.AUTH_USER_MODEL, 'username', 'is_active'),
+)
+
+
+def get_sources(apps):
+    for kind, code, label, label_field, published_field in SOURCES:
+        model = apps.get_model(label)
+        yield (
+            kind, code, model._meta.db_table,
+            model._meta.get_field(label_field).column,
+            model._meta.get_field(published_field).column,
+        )
+
+
+def create_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(
+        "CREATE VIRTUAL TABLE blog_autocomplete USING fts5("
+        "kind UNINDEXED, object_id UNINDEXED, label, "
+        "is_published UNINDEXED, tokenize='trigram')"
+    )
+    for kind, code, table, label, published in get_sources(apps):
+        row = f"new.id * 4 + {code}, '{kind}', new.id, new.{label}, "
+        row += f"new.{published}"
+        schema_editor.execute(
+            f"CREATE TRIGGER blog_autocomplete_{kind}_ai "
+            f"AFTER INSERT ON {table} BEGIN "
+            "INSERT INTO blog_autocomplete"
+            "(rowid, kind, object_id, label, is_published) "
+            f"VALUES ({row}); END"
+        )
+        schema_editor.execute(
+            f"CREATE TRIGGER blog_autocomplete_{kind}_ad "
+            f"AFTER DELETE ON {table} BEGIN "
+            "DELETE FROM blog_autocomplete "
+            f"WHERE rowid = old.id * 4 + {code}; END"
+        )
+        schema_editor.execute(
+            f"CREATE TRIGGER blog_autocomplete_{kind}_au "
+            f"AFTER UPDATE OF {label}, {published} ON {table} BEGIN "
+            "UPDATE blog_autocomplete "
+            f"SET label = new.{label}, is_published = new.{published} "
+            f"WHERE rowid = old.id * 4 + {code}; END"
+        )
+        schema_editor.execute(
+            "INSERT INTO blog_autocomplete"
+            "(rowid, kind, object_id, label, is_published) "
+            f"SELECT id * 4 + {code}, '{kind}', id, {label}, {published} "
+            f"FROM {table}"
+        )
+
+
+def drop_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for kind, *_ in SOURCES:
+        for suffix in ('ai', 'ad', 'au'):
+            schema_editor.execute(
+                f'DROP TRIGGER IF EXISTS blog_autocomplete_{kind}_{suffix}'
+            )
+    schema_editor.execute('DROP TABLE IF EXISTS blog_autocomplete')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('blog', '0008_post_search'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AutocompleteEntry',
+            fields=[
+                ('id', models.BigIntegerField(db_column='rowid', primary_key=True, serialize=False)),
+                ('kind', models.CharField(max_length=16, verbose_name='Тип')),
+                ('object_id', models.IntegerField(verbose_name='Идентификатор объекта')),
+                ('label', models.TextField(verbose_name='Название')),
+                ('is_published', models.BooleanField(verbose_name='Опубликовано')),
+                ('document', blog.search.SearchDocumentField(db_column='blog_autocomplete')),
+            ],
+            options={
+                'verbose_name': 'запись автодополнения',
+                'verbose_name_plural': 'Автодополнение',
+                'db_table': 'blog_autocomplete',
+                'managed': False,
+            },
+        ),
+        migrations.RunPython(create_index, drop_index),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 3.2.16 on 2026-10-18 04:07
+
+from importlib import import_module
+
+from django.db import migrations, models
+
+post_search = import_module('blog.migrations.0008_post_search')
+# AddField и RemoveField в SQLite пересоздают blog_post вместе с её
+# триггерами, поэтому триггеры поиска восстанавливаются после них.
+restore_search_triggers = post_search.run_sqlite(post_search.TRIGGERS_SQL)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0009_autocomplete'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            migrations.RunPython.noop, restore_search_triggers
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='image_variants',
+            field=models.JSONField(default=dict, editable=False, help_text='Ширины готовых уменьшенных копий по форматам.', verbose_name='Варианты картинки'),
+        ),
+        migrations.RunPython(
+            restore_search_triggers, migrations.RunPython.noop
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 3.2.16 on 2026-10-18 04:47
+
+from importlib import import_module
+
+import blog.storage
+from django.db import migrations, models
+
+post_search = import_module('blog.migrations.0008_post_search')
+# AlterField в SQLite пересоздаёт blog_post вместе с её триггерами
+restore_search_triggers = post_search.run_sqlite(post_search.TRIGGERS_SQL)
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0012_stored_image'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            migrations.RunPython.noop, restore_search_triggers
+        ),
+        migrations.AlterField(
+            model_name='post',
+            name='image',
+            field=models.ImageField(blank=True, db_index=True, storage=blog.storage.ContentAddressedStorage(), upload_to='posts', verbose_name='Картинка в публикации'),
+        ),
+        migrations.RunPython(
+            restore_search_triggers, migrations.RunPython.noop
+        ),
+    ]
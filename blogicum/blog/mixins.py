@@ -1,16 +1,41 @@
+import hashlib
+
+from django.conf import settings
 from django.contrib.auth.mixins import UserPassesTestMixin
 from django.shortcuts import redirect
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+from .caching import attach_card_versions
+from .paginators import CachedCountPaginator, KeysetPaginator
 
 
-class OnlyAuthorMixin(UserPassesTestMixin):
+class SingleObjectCacheMixin:
+    """
+    Миксин, загружающий объект один раз за запрос.
+
+    Проверки доступа в миксинах и сами UpdateView/DeleteView вызывают
+    get_object() независимо друг от друга; повторные вызовы получают
+    уже загруженный объект.
+    """
+
+    def get_object(self, queryset=None):
+        if queryset is not None:
+            return super().get_object(queryset)
+        if not hasattr(self, '_object'):
+            self._object = super().get_object()
+        return self._object
+
+
+class OnlyAuthorMixin(SingleObjectCacheMixin, UserPassesTestMixin):
     """Миксин для ограничения доступа"""
 
     def test_func(self):
         obj = self.get_object()
-        return obj.author == self.request.user
+        return obj.author_id == self.request.user.pk
 
 
-class UserCanDeleteMixin(UserPassesTestMixin):
+class UserCanDeleteMixin(SingleObjectCacheMixin, UserPassesTestMixin):
     """
     Миксин, позволяющий удалять объект только в том случае,
     если текущий пользователь является автором объекта
@@ -18,14 +43,137 @@ class UserCanDeleteMixin(UserPassesTestMixin):
 
     def test_func(self):
         obj = self.get_object()
-        return obj.author == self.request.user
+        return obj.author_id == self.request.user.pk
 
 
-class AuthorRequiredMixin(UserPassesTestMixin):
+class AuthorRequiredMixin(SingleObjectCacheMixin, UserPassesTestMixin):
     """Миксин выполняющий проверку авторства"""
 
     def dispatch(self, request, *args, **kwargs):
         post = self.get_object()
-        if post.author != request.user:
+        if post.author_id != request.user.pk:
             return redirect('blog:post_detail', id=post.id)
         return super().dispatch(request, *args, **kwargs)
+
+
+class FeedPaginationMixin:
+    """
+    Миксин курсорной пагинации для лент публикаций.
+
+    Ссылки вида ?page=N обслуживаются CachedCountPaginator,
+    остальные запросы — KeysetPaginator по keyset_keys.
+    """
+
+    cursor_kwarg = 'cursor'
+    keyset_keys = ('pub_date', 'id')
+    keyset_descending = True
+    paginator_class = CachedCountPaginator
+
+    def get_count_cache_key(self):
+        """Ключ ленты для кеша количества постов"""
+        return None
+
+    def get_paginator(self, queryset, per_page, orphans=0,
+                      allow_empty_first_page=True, **kwargs):
+        return self.paginator_class(
+            queryset, per_page, orphans=orphans,
+            allow_empty_first_page=allow_empty_first_page,
+            count_key=self.get_count_cache_key(), **kwargs
+        )
+
+    def use_keyset_pagination(self):
+        return (
+            settings.KEYSET_PAGINATION
+            and self.page_kwarg not in self.request.GET
+        )
+
+    def paginate_queryset(self, queryset, page_size):
+        if not self.use_keyset_pagination():
+            paginator, page, object_list, is_paginated = (
+                super().paginate_queryset(queryset, page_size)
+            )
+        else:
+            paginator = KeysetPaginator(
+                queryset, page_size,
+                keys=self.keyset_keys, descending=self.keyset_descending,
+            )
+            page = paginator.get_page(
+                self.request.GET.get(self.cursor_kwarg)
+            )
+            is_paginated = page.has_other_pages()
+        page.object_list = attach_card_versions(list(page.object_list))
+        return paginator, page, page.object_list, is_paginated
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['post_card_timeout'] = settings.POST_CARD_CACHE_TIMEOUT
+        return context
+
+
+class ConditionalGetMixin:
+    """
+    Миксин условных GET-запросов (ETag и Last-Modified).
+
+    Валидаторы считаются по уже выбранным объектам страницы до рендеринга
+    шаблона, поэтому неизменившаяся страница отдаётся ответом 304
+    без обращения к шаблонизатору.
+    """
+
+    def get_validator_objects(self, context):
+        """Объекты страницы, от которых зависит её содержимое"""
+        return ()
+
+    def get_validator_extra(self, context):
+        """Прочие данные страницы, не хранящиеся в объектах моделей"""
+        return ()
+
+    def get_last_modified(self, context):
+        """Время изменения страницы, если его можно вычислить точно"""
+        return None
+
+    def get_etag(self, context):
+        user = self.request.user
+        parts = [user.pk, self.request.META.get('CSRF_COOKIE')]
+        for obj in self.get_validator_objects(context):
+            if obj is not None:
+                parts.append((
+                    obj._meta.label, obj.pk, getattr(obj, 'updated_at', None)
+                ))
+        parts.extend(self.get_validator_extra(context))
+        return quote_etag(hashlib.md5(repr(parts).encode()).hexdigest())
+
+    def get(self, request, *args, **kwargs):
+        response = super().get(request, *args, **kwargs)
+        context = getattr(response, 'context_data', None)
+        if context is None or response.status_code != 200:
+            return response
+        etag = self.get_etag(context)
+        last_modified = self.get_last_modified(context)
+        timestamp = int(last_modified.timestamp()) if last_modified else None
+        conditional = get_conditional_response(
+            request, etag=etag, last_modified=timestamp, response=response
+        )
+        if conditional is not response:
+            # Ответ 304: шаблон так и не будет отрендерен
+            response = conditional
+        response['ETag'] = etag
+        if last_modified is not None:
+            response['Last-Modified'] = http_date(timestamp)
+        return response
+
+
+class FeedConditionalGetMixin(ConditionalGetMixin):
+    """Валидаторы страницы ленты: посты, их связи и состояние пагинации"""
+
+    def get_validator_objects(self, context):
+        for post in context['page_obj']:
+            yield post
+            yield post.category
+            yield post.location
+
+    def get_validator_extra(self, context):
+        page = context['page_obj']
+        yield [(post.pk, post.author.username) for post in page]
+        yield page.has_previous(), page.has_next()
+        if not getattr(page, 'is_keyset', False):
+            yield page.number, page.paginator.num_pages
@@ -3,10 +3,15 @@ from django.contrib.auth import get_user_model
 from django.db import models
 from django.urls import reverse
 
+from .search import AUTOCOMPLETE_TABLE, FTS_TABLE, SearchDocumentField
+from .storage import post_image_storage
+
 User = get_user_model()
 
 
 MAX_TEXT_LENGTH = 30
+# Поля поста, от которых зависит is_visible
+VISIBILITY_FIELDS = {'is_published', 'category', 'category_id'}
 
 
 class Published(models.Model):
@@ -27,7 +32,14 @@ class Created(models.Model):
         abstract = True
 
 
-class Category(Published, Created):
+class Updated(models.Model):
+    updated_at = models.DateTimeField('Изменено', auto_now=True,)
+
+    class Meta:
+        abstract = True
+
+
+class Category(Published, Created, Updated):
 
     title = models.CharField('Заголовок', max_length=settings.MAX_FIELD_LENGTH)
     description = models.TextField('Описание')
@@ -49,7 +61,7 @@ class Category(Published, Created):
         return self.title[:settings.REPRESENTATION_LENGTH]
 
 
-class Location(Published, Created):
+class Location(Published, Created, Updated):
 
     name = models.CharField('Название места',
                             max_length=settings.MAX_FIELD_LENGTH)
@@ -63,7 +75,7 @@ class Location(Published, Created):
         return self.name[:settings.REPRESENTATION_LENGTH]
 
 
-class Post(Published, Created):
+class Post(Published, Created, Updated):
     title = models.CharField('Заголовок', max_length=settings.MAX_FIELD_LENGTH)
     text = models.TextField('Текст')
     pub_date = models.DateTimeField(
@@ -71,7 +83,13 @@ class Post(Published, Created):
         help_text='Если установить дату и время в будущем — '
                   'можно делать отложенные публикации.'
     )
-    image = models.ImageField(verbose_name='Картинка в публикации', blank=True)
+    image = models.ImageField(
+        verbose_name='Картинка в публикации',
+        blank=True,
+        upload_to='posts',
+        storage=post_image_storage,
+        db_index=True,
+    )
     author = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
@@ -88,20 +106,131 @@ class Post(Published, Created):
         on_delete=models.SET_NULL,
         verbose_name='Местоположение',
     )
+    comment_count = models.PositiveIntegerField(
+        'Количество комментариев', default=0, editable=False
+    )
+    is_visible = models.BooleanField(
+        'Доступно читателям',
+        default=False,
+        editable=False,
+        help_text='Пост и его категория опубликованы.'
+    )
+    image_variants = models.JSONField(
+        'Варианты картинки',
+        default=dict,
+        editable=False,
+        help_text='Ширины готовых уменьшенных копий по форматам.'
+    )
 
     class Meta:
         default_related_name = 'posts'
         verbose_name = 'публикация'
         verbose_name_plural = 'Публикации'
         ordering = ('-pub_date',)
+        indexes = (
+            models.Index(
+                fields=('-pub_date', '-id'),
+                condition=models.Q(is_visible=True),
+                name='post_visible_feed_idx',
+            ),
+            models.Index(
+                fields=('category', '-pub_date', '-id'),
+                condition=models.Q(is_visible=True),
+                name='post_category_feed_idx',
+            ),
+            models.Index(
+                fields=('author', '-pub_date', '-id'),
+                name='post_author_feed_idx',
+            ),
+        )
 
     def __str__(self):
         return self.title[:settings.REPRESENTATION_LENGTH]
 
+    def save(self, *args, update_fields=None, **kwargs):
+        # is_visible пересчитывает сигнал pre_save; при частичном
+        # сохранении его нужно записать вместе с полями, от которых
+        # он зависит, — изменить update_fields сигнал не может
+        if update_fields is not None and (
+                VISIBILITY_FIELDS & set(update_fields)):
+            update_fields = {*update_fields, 'is_visible'}
+        super().save(*args, update_fields=update_fields, **kwargs)
+
     def get_absolute_url(self):
         return reverse('blog:post_detail', args=(self.pk,))
 
 
+class StoredImage(models.Model):
+    """
+    Счётчик ссылок на файл картинки в ContentAddressedStorage.
+
+    Хранилище увеличивает счётчик до проверки, есть ли файл на диске,
+    а удаление файла блокирует строку счётчика, поэтому загрузка того
+    же файла не может проскочить между проверкой и удалением.
+    """
+
+    name = models.CharField('Файл', max_length=255, unique=True)
+    references = models.PositiveIntegerField('Ссылок', default=0)
+
+    class Meta:
+        verbose_name = 'файл картинки'
+        verbose_name_plural = 'Файлы картинок'
+
+    def __str__(self):
+        return self.name
+
+
+class PostSearchIndex(models.Model):
+    """
+    Полнотекстовый индекс FTS5 по заголовку и тексту поста.
+
+    Таблица создаётся миграцией и обновляется триггерами, поэтому
+    Django ею не управляет и сам в неё не пишет.
+    """
+
+    post = models.OneToOneField(
+        Post,
+        on_delete=models.DO_NOTHING,
+        primary_key=True,
+        db_column='rowid',
+        db_constraint=False,
+        related_name='search_index',
+    )
+    title = models.TextField('Заголовок')
+    text = models.TextField('Текст')
+    document = SearchDocumentField(db_column=FTS_TABLE)
+    rank = models.FloatField('Релевантность')
+
+    class Meta:
+        managed = False
+        db_table = FTS_TABLE
+        verbose_name = 'поисковый индекс'
+        verbose_name_plural = 'Поисковый индекс'
+
+
+class AutocompleteEntry(models.Model):
+    """
+    Триграммный индекс FTS5 по названиям категорий, местоположений
+    и именам пользователей для автодополнения.
+
+    Как и PostSearchIndex, таблица создаётся миграцией и заполняется
+    триггерами на исходных таблицах.
+    """
+
+    id = models.BigIntegerField(primary_key=True, db_column='rowid')
+    kind = models.CharField('Тип', max_length=16)
+    object_id = models.IntegerField('Идентификатор объекта')
+    label = models.TextField('Название')
+    is_published = models.BooleanField('Опубликовано')
+    document = SearchDocumentField(db_column=AUTOCOMPLETE_TABLE)
+
+    class Meta:
+        managed = False
+        db_table = AUTOCOMPLETE_TABLE
+        verbose_name = 'запись автодополнения'
+        verbose_name_plural = 'Автодополнение'
+
+
 class Comment(Published, Created):
     author = models.ForeignKey(
         User,
@@ -121,6 +250,12 @@ class Comment(Published, Created):
         verbose_name = 'комментарий'
         verbose_name_plural = 'Комментарии'
         ordering = ('created_at',)
+        indexes = (
+            models.Index(
+                fields=('post', 'created_at', 'id'),
+                name='comment_post_thread_idx',
+            ),
+        )
 
     def __str__(self):
         return self.text[MAX_TEXT_LENGTH]
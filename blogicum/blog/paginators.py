@@ -0,0 +1,248 @@
+import base64
+import binascii
+import datetime
+import json
+from collections.abc import Sequence
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.paginator import (
+    InvalidPage, Page, PageNotAnInteger, Paginator
+)
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+from .caching import cap_timeout, get_version
+
+
+class CursorEncoder(DjangoJSONEncoder):
+    """Кодировщик значений курсора без потери микросекунд"""
+
+    def default(self, o):
+        if isinstance(o, datetime.datetime):
+            return o.isoformat()
+        return super().default(o)
+
+
+class InvalidCursor(Exception):
+    """Курсор повреждён или не соответствует ключам пагинатора"""
+
+
+class KeysetPage(Sequence):
+    """Страница курсорной пагинации"""
+
+    is_keyset = True
+
+    def __init__(self, object_list, paginator,
+                 has_next, has_previous):
+        self.object_list = object_list
+        self.paginator = paginator
+        self._has_next = has_next
+        self._has_previous = has_previous
+
+    def __repr__(self):
+        return '<KeysetPage of %d objects>' % len(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+    @property
+    def next_cursor(self):
+        if not self.has_next() or not self.object_list:
+            return None
+        return self.paginator.encode_cursor(self.object_list[-1], 'next')
+
+    @property
+    def previous_cursor(self):
+        if not self.has_previous() or not self.object_list:
+            return None
+        return self.paginator.encode_cursor(self.object_list[0], 'prev')
+
+
+class KeysetPaginator:
+    """
+    Пагинатор по ключам сортировки (seek-пагинация).
+
+    Вместо LIMIT/OFFSET и COUNT(*) каждая страница выбирается условием
+    «строго после (или до) последней показанной записи», поэтому стоимость
+    запроса не зависит от номера страницы. Последний ключ должен быть
+    уникальным (обычно это первичный ключ).
+    """
+
+    def __init__(self, queryset, per_page,
+                 keys=('pub_date', 'id'), descending=True):
+        self.queryset = queryset
+        self.per_page = int(per_page)
+        self.keys = tuple(keys)
+        self.descending = descending
+
+    def encode_cursor(self, obj, direction):
+        if isinstance(obj, dict):
+            # Строки queryset.values()
+            values = [obj[key] for key in self.keys]
+        else:
+            values = [getattr(obj, key) for key in self.keys]
+        payload = json.dumps([direction, values], cls=CursorEncoder)
+        return base64.urlsafe_b64encode(
+            payload.encode()
+        ).decode().rstrip('=')
+
+    def decode_cursor(self, cursor):
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            direction, values = json.loads(
+                base64.urlsafe_b64decode(padded.encode())
+            )
+            if direction not in ('next', 'prev'):
+                raise ValueError(direction)
+            if len(values) != len(self.keys):
+                raise ValueError(values)
+            values = [
+                self._get_key_field(key).to_python(value)
+                for key, value in zip(self.keys, values)
+            ]
+        except (ValueError, TypeError, binascii.Error, ValidationError):
+            raise InvalidCursor(cursor)
+        return direction, values
+
+    def _get_key_field(self, key):
+        """Поле модели или аннотации, по которому идёт сортировка"""
+        annotation = self.queryset.query.annotations.get(key)
+        if annotation is not None:
+            return annotation.output_field
+        return self.queryset.model._meta.get_field(key)
+
+    def _ordering(self, reverse):
+        descending = self.descending != reverse
+        return [('-' if descending else '') + key for key in self.keys]
+
+    def _seek_filter(self, values, reverse):
+        """Условие (k1, k2, ...) > (v1, v2, ...) в нужном направлении"""
+        descending = self.descending != reverse
+        lookup = 'lt' if descending else 'gt'
+        condition = Q()
+        for index, key in enumerate(self.keys):
+            step = Q(**{f'{key}__{lookup}': values[index]})
+            for prev_key, prev_value in zip(self.keys[:index], values):
+                step &= Q(**{prev_key: prev_value})
+            condition |= step
+        return condition
+
+    def get_page(self, cursor=None):
+        """
+        Возвращает страницу по курсору; некорректный курсор,
+        как и в Paginator.get_page, даёт первую страницу.
+        """
+        try:
+            direction, values = (
+                self.decode_cursor(cursor) if cursor else (None, None)
+            )
+        except InvalidCursor:
+            direction, values = None, None
+
+        reverse = direction == 'prev'
+        queryset = self.queryset.order_by(*self._ordering(reverse))
+        if values is not None:
+            queryset = queryset.filter(self._seek_filter(values, reverse))
+        rows = list(queryset[:self.per_page + 1])
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+
+        if reverse:
+            rows.reverse()
+            return KeysetPage(rows, self, has_next=True,
+                              has_previous=has_more)
+        return KeysetPage(rows, self, has_next=has_more,
+                          has_previous=direction is not None)
+
+
+class WindowedPage(Page):
+    """Страница, которая отдаёт ограниченное окно ссылок на страницы"""
+
+    @property
+    def page_window(self):
+        """Первые, последние и соседние с текущей страницы с пропусками"""
+        return self.paginator.get_elided_page_range(
+            self.number,
+            on_each_side=settings.PAGINATOR_ON_EACH_SIDE,
+            on_ends=settings.PAGINATOR_ON_ENDS,
+        )
+
+
+class CachedCountPaginator(Paginator):
+    """
+    Paginator, который берёт количество объектов из кеша.
+
+    Ключ count_key задаёт ленту (общая, категория, автор); кеш
+    сбрасывается при записи постов через версию «posts». Если задан
+    settings.FEED_COUNT_LIMIT, объекты считаются не дальше этого порога,
+    а страницы за пределами оценки остаются доступными.
+    """
+
+    def __init__(self, *args, count_key=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.count_key = count_key
+        self.count_limit = settings.FEED_COUNT_LIMIT
+
+    def _count(self):
+        if self.count_limit is None:
+            return super().count
+        return self.object_list[:self.count_limit].count()
+
+    @cached_property
+    def count(self):
+        if self.count_key is None:
+            return self._count()
+        key = 'blog:feed-count:{}:{}'.format(
+            get_version('posts'), self.count_key
+        )
+        count = cache.get(key)
+        if count is None:
+            count = self._count()
+            cache.set(
+                key, count, cap_timeout(settings.FEED_COUNT_CACHE_TIMEOUT)
+            )
+        return count
+
+    @property
+    def is_approximate(self):
+        return (
+            self.count_limit is not None and self.count >= self.count_limit
+        )
+
+    def _get_page(self, *args, **kwargs):
+        return WindowedPage(*args, **kwargs)
+
+    def validate_number(self, number):
+        if not self.is_approximate:
+            return super().validate_number(number)
+        try:
+            number = int(number)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger('Номер страницы должен быть целым числом')
+        if number < 1:
+            raise InvalidPage('Номер страницы меньше 1')
+        return number
+
+    def page(self, number):
+        if not self.is_approximate:
+            return super().page(number)
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        return self._get_page(
+            self.object_list[bottom:bottom + self.per_page], number, self
+        )
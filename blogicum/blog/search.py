@@ -0,0 +1,69 @@
+import re
+
+from django.db import models
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+FTS_TABLE = 'blog_post_fts'
+AUTOCOMPLETE_TABLE = 'blog_autocomplete'
+# Границы совпадений во фрагменте: символы, которых нет в тексте постов,
+# чтобы экранировать фрагмент целиком и уже потом расставить <mark>.
+HIGHLIGHT_START = '\x02'
+HIGHLIGHT_END = '\x03'
+SNIPPET_ELLIPSIS = '…'
+SNIPPET_TOKENS = 24
+MAX_QUERY_TERMS = 8
+
+TERM_RE = re.compile(r'\w+')
+
+
+class SearchDocumentField(models.TextField):
+    """Скрытый столбец FTS5 с именем таблицы, по которому делается MATCH"""
+
+
+@SearchDocumentField.register_lookup
+class Match(models.Lookup):
+    lookup_name = 'match'
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f'{lhs} MATCH {rhs}', lhs_params + rhs_params
+
+
+def get_terms(query):
+    """Слова поискового запроса без знаков препинания и операторов"""
+    return TERM_RE.findall(query or '')[:MAX_QUERY_TERMS]
+
+
+def build_match_query(query):
+    """
+    Превращает пользовательский ввод в запрос FTS5.
+
+    Каждое слово берётся в кавычки, чтобы операторы и спецсимволы
+    FTS5 не ломали разбор, а последнее слово ищется по префиксу.
+    Пустой ввод даёт None.
+    """
+    terms = get_terms(query)
+    if not terms:
+        return None
+    quoted = [f'"{term}"' for term in terms]
+    quoted[-1] += '*'
+    return ' '.join(quoted)
+
+
+def snippet_sql():
+    """SQL фрагмента с совпадениями из наиболее подходящего столбца"""
+    return (
+        f"snippet({FTS_TABLE}, -1, '{HIGHLIGHT_START}', '{HIGHLIGHT_END}', "
+        f"'{SNIPPET_ELLIPSIS}', {SNIPPET_TOKENS})"
+    )
+
+
+def highlight(snippet):
+    """Экранирует фрагмент и выделяет совпадения тегом <mark>"""
+    return mark_safe(
+        escape(snippet or '')
+        .replace(HIGHLIGHT_START, '<mark>')
+        .replace(HIGHLIGHT_END, '</mark>')
+    )
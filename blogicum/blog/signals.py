@@ -0,0 +1,200 @@
+import threading
+
+from django.contrib.auth import get_user_model
+from django.db.models import F
+from django.db.models.signals import (
+    post_delete, post_init, post_save, pre_delete, pre_save
+)
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .caching import bump_versions
+from .images import release_image, schedule_variants, unclaim_image
+from .models import VISIBILITY_FIELDS, Category, Comment, Location, Post
+
+User = get_user_model()
+
+# Поля пользователя, которые выводятся на страницах и в карточках
+USER_DISPLAY_FIELDS = {'username', 'first_name', 'last_name', 'is_active'}
+
+# Посты, удаляемые в текущем потоке: их счётчики обновлять незачем
+_deleting_posts = threading.local()
+
+
+def is_display_change(sender, update_fields):
+    """
+    Меняет ли сохранение то, что видно на страницах. Вход на сайт
+    сохраняет пользователя с update_fields=['last_login'] и кеш
+    сбрасывать не должен.
+    """
+    return sender is not User or update_fields is None or bool(
+        USER_DISPLAY_FIELDS & set(update_fields)
+    )
+
+
+@receiver(pre_delete, sender=Post)
+def remember_deleting_post(sender, instance, **kwargs):
+    if not hasattr(_deleting_posts, 'ids'):
+        _deleting_posts.ids = set()
+    _deleting_posts.ids.add(instance.pk)
+
+
+@receiver(post_delete, sender=Post)
+def forget_deleting_post(sender, instance, **kwargs):
+    getattr(_deleting_posts, 'ids', set()).discard(instance.pk)
+
+
+@receiver(post_save, sender=Comment)
+def increment_comment_count(sender, instance, created, raw=False, **kwargs):
+    """Увеличивает счётчик комментариев поста при создании комментария"""
+    if created and not raw:
+        Post.objects.filter(pk=instance.post_id).update(
+            comment_count=F('comment_count') + 1,
+            updated_at=timezone.now(),
+        )
+        bump_versions(f'post:{instance.post_id}')
+
+
+@receiver(post_save, sender=Comment)
+def touch_commented_post(sender, instance, created, raw=False, **kwargs):
+    """Отмечает изменение поста при редактировании его комментария"""
+    if not created and not raw:
+        Post.objects.filter(pk=instance.post_id).update(
+            updated_at=timezone.now()
+        )
+
+
+@receiver(post_delete, sender=Comment)
+def decrement_comment_count(sender, instance, **kwargs):
+    """Уменьшает счётчик комментариев поста при удалении комментария"""
+    if instance.post_id in getattr(_deleting_posts, 'ids', ()):
+        return
+    Post.objects.filter(
+        pk=instance.post_id, comment_count__gt=0
+    ).update(
+        comment_count=F('comment_count') - 1, updated_at=timezone.now()
+    )
+    bump_versions(f'post:{instance.post_id}')
+
+
+@receiver(pre_save, sender=Post)
+def set_post_visibility(sender, instance, raw=False, update_fields=None,
+                        **kwargs):
+    """
+    Пересчитывает флаг видимости поста перед сохранением. Фикстуры
+    (raw) загружаются как есть, а частичное сохранение без полей
+    видимости флаг не трогает.
+    """
+    if raw or update_fields is not None and not (
+            (VISIBILITY_FIELDS | {'is_visible'}) & update_fields):
+        return
+    instance.is_visible = instance.is_published and Category.objects.filter(
+        pk=instance.category_id, is_published=True
+    ).exists()
+
+
+@receiver(post_save, sender=Category)
+def sync_category_visibility(sender, instance, **kwargs):
+    """Переносит публикацию категории на флаг видимости её постов"""
+    posts = Post.objects.filter(category=instance)
+    if instance.is_published:
+        posts.filter(is_published=True, is_visible=False).update(
+            is_visible=True
+        )
+    else:
+        posts.filter(is_visible=True).update(is_visible=False)
+
+
+@receiver(pre_delete, sender=Category)
+def hide_category_posts(sender, instance, **kwargs):
+    """Скрывает посты удаляемой категории: они останутся без категории"""
+    Post.objects.filter(category=instance, is_visible=True).update(
+        is_visible=False
+    )
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_post_feeds(sender, **kwargs):
+    """Сбрасывает кешированные количества постов в лентах"""
+    bump_versions('posts')
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+@receiver(post_save, sender=User)
+def invalidate_post_cards(sender, instance, update_fields=None, **kwargs):
+    """Сбрасывает кешированные карточки постов, зависящие от объекта"""
+    if not is_display_change(sender, update_fields):
+        return
+    prefix = 'user' if sender is User else sender._meta.model_name
+    bump_versions(f'{prefix}:{instance.pk}')
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+@receiver(post_save, sender=User)
+def purge_page_cache(sender, update_fields=None, **kwargs):
+    """Сбрасывает кеш страниц для анонимных посетителей"""
+    if not is_display_change(sender, update_fields):
+        return
+    bump_versions('content')
+
+
+@receiver(post_save, sender=Post)
+def generate_image_variants(sender, instance, raw=False, **kwargs):
+    """Заказывает уменьшенные копии новой или заменённой картинки"""
+    if raw or not instance.image:
+        return
+    if (instance.image_variants or {}).get('source') == instance.image.name:
+        return
+    schedule_variants(instance)
+
+
+@receiver(post_init, sender=Post)
+def remember_stored_image(sender, instance, **kwargs):
+    # Имя файла из базы; у отложенного поля значения в __dict__ нет
+    value = instance.__dict__.get('image')
+    instance._stored_image = getattr(value, 'name', value)
+
+
+@receiver(pre_save, sender=Post)
+def remember_image_upload(sender, instance, raw=False, **kwargs):
+    # Несохранённый файл запишет хранилище и учтёт в счётчике ссылок
+    image = instance.__dict__.get('image')
+    instance._uploading_image = bool(
+        not raw and image and not getattr(image, '_committed', True)
+    )
+
+
+@receiver(post_save, sender=Post)
+def release_replaced_image(sender, instance, raw=False, **kwargs):
+    """Освобождает прежний файл заменённой или убранной картинки"""
+    if raw or 'image' not in instance.__dict__:
+        return
+    stored = getattr(instance, '_stored_image', None)
+    if stored and stored != instance.image.name:
+        release_image(stored)
+    elif stored and getattr(instance, '_uploading_image', False):
+        # Загрузили ту же картинку: пост уже ссылался на этот файл
+        unclaim_image(stored)
+    instance._stored_image = instance.image.name
+
+
+@receiver(post_delete, sender=Post)
+def release_deleted_image(sender, instance, **kwargs):
+    """Освобождает файл картинки удалённого поста"""
+    if instance.image:
+        release_image(instance.image.name)
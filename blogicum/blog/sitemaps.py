@@ -0,0 +1,255 @@
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+from xml.sax.saxutils import escape
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.files import locks
+from django.db.models import Count, F, Max, Sum
+from django.urls import reverse
+from django.utils import timezone
+
+from .models import Category, Post
+
+User = get_user_model()
+
+XMLNS = 'http://www.sitemaps.org/schemas/sitemap/0.9'
+MANIFEST = 'manifest.json'
+LOCK = '.lock'
+INDEX = 'sitemap.xml'
+
+
+class SitemapSection:
+    """
+    Раздел карты сайта, разбитый на шарды по диапазонам id.
+
+    Шард перестраивается, только если изменился его отпечаток:
+    количество, сумма и наибольшее время изменения строк шарда.
+    Разделу без времени изменения в отпечаток добавляется хеш
+    столбцов digest_columns. Отпечаток строится только по базе, так
+    что команды build_sitemaps в разных процессах получают одинаковый.
+    """
+
+    name = None
+    columns = ('id',)
+    lastmod_field = None
+    digest_columns = ()
+
+    def get_queryset(self):
+        raise NotImplementedError
+
+    def get_location(self, row):
+        raise NotImplementedError
+
+    def get_fingerprints(self, shard_size):
+        """Отпечатки всех непустых шардов одним запросом"""
+        aggregates = {'count': Count('id'), 'id_sum': Sum('id')}
+        if self.lastmod_field:
+            aggregates['lastmod'] = Max(self.lastmod_field)
+        rows = list(
+            self.get_queryset().order_by()
+            .annotate(shard=F('id') / shard_size)
+            .values('shard').annotate(**aggregates)
+        )
+        digests = self.get_digests(shard_size)
+        return {
+            str(row['shard']): [
+                row['count'], row['id_sum'],
+                row.get('lastmod') and row['lastmod'].isoformat(),
+                digests.get(row['shard']),
+            ]
+            for row in rows
+        }
+
+    def get_digests(self, shard_size):
+        """Хеши столбцов digest_columns по шардам, одним проходом"""
+        if not self.digest_columns:
+            return {}
+        digests = {}
+        rows = self.get_queryset().order_by('id').values_list(
+            'id', *self.digest_columns
+        ).iterator(chunk_size=settings.SITEMAP_CHUNK_SIZE)
+        for row in rows:
+            shard = row[0] // shard_size
+            if shard not in digests:
+                digests[shard] = hashlib.sha256()
+            digests[shard].update(json.dumps(row).encode())
+        return {
+            shard: digest.hexdigest() for shard, digest in digests.items()
+        }
+
+    def iter_rows(self, shard, shard_size, chunk_size):
+        """Строки шарда порциями по первичному ключу"""
+        queryset = self.get_queryset().filter(
+            id__gte=shard * shard_size, id__lt=(shard + 1) * shard_size
+        ).order_by('id').values(*self.columns)
+        last_id = -1
+        while True:
+            chunk = list(queryset.filter(id__gt=last_id)[:chunk_size])
+            yield from chunk
+            if len(chunk) < chunk_size:
+                return
+            last_id = chunk[-1]['id']
+
+
+class PostSection(SitemapSection):
+    name = 'posts'
+    columns = ('id', 'updated_at')
+    lastmod_field = 'updated_at'
+
+    def get_queryset(self):
+        return Post.objects.filter(
+            is_visible=True, pub_date__lte=timezone.now()
+        )
+
+    def get_location(self, row):
+        return reverse('blog:post_detail', args=(row['id'],))
+
+
+class CategorySection(SitemapSection):
+    name = 'categories'
+    columns = ('id', 'slug', 'updated_at')
+    lastmod_field = 'updated_at'
+
+    def get_queryset(self):
+        return Category.objects.filter(is_published=True)
+
+    def get_location(self, row):
+        return reverse('blog:category_posts', args=(row['slug'],))
+
+
+class ProfileSection(SitemapSection):
+    name = 'profiles'
+    columns = ('id', 'username')
+    # У пользователя нет updated_at: смену имени видно только по хешу
+    digest_columns = ('username',)
+
+    def get_queryset(self):
+        return User.objects.filter(is_active=True)
+
+    def get_location(self, row):
+        return reverse('blog:profile', args=(row['username'],))
+
+
+SECTIONS = {
+    section.name: section
+    for section in (PostSection(), CategorySection(), ProfileSection())
+}
+
+
+def get_shard(pk):
+    return pk // settings.SITEMAP_SHARD_SIZE
+
+
+def get_shard_filename(section, shard):
+    return f'{section}-{shard}.xml'
+
+
+def get_root():
+    return Path(settings.SITEMAP_ROOT)
+
+
+def write_atomic(path, chunks):
+    """Пишет файл по частям и подменяет старый только целиком"""
+    fd, temp = tempfile.mkstemp(
+        dir=path.parent, prefix=path.name + '.', suffix='.tmp'
+    )
+    try:
+        with open(fd, 'w', encoding='utf-8') as file:
+            for chunk in chunks:
+                file.write(chunk)
+        os.chmod(temp, 0o644)
+        os.replace(temp, path)
+    except BaseException:
+        os.unlink(temp)
+        raise
+
+
+def render_shard(section, shard):
+    base = settings.SITE_URL.rstrip('/')
+    yield '<?xml version="1.0" encoding="UTF-8"?>\n'
+    yield f'<urlset xmlns="{XMLNS}">\n'
+    for row in section.iter_rows(
+        shard, settings.SITEMAP_SHARD_SIZE, settings.SITEMAP_CHUNK_SIZE
+    ):
+        yield '<url><loc>{}</loc>'.format(
+            escape(base + section.get_location(row))
+        )
+        if section.lastmod_field and row[section.lastmod_field]:
+            yield '<lastmod>{}</lastmod>'.format(
+                row[section.lastmod_field].isoformat()
+            )
+        yield '</url>\n'
+    yield '</urlset>\n'
+
+
+def render_index(manifest):
+    base = settings.SITE_URL.rstrip('/')
+    yield '<?xml version="1.0" encoding="UTF-8"?>\n'
+    yield f'<sitemapindex xmlns="{XMLNS}">\n'
+    for section, shards in manifest.items():
+        for shard, fingerprint in sorted(
+            shards.items(), key=lambda item: int(item[0])
+        ):
+            url = reverse('blog:sitemap_section', args=(section, int(shard)))
+            yield '<sitemap><loc>{}</loc>'.format(escape(base + url))
+            if fingerprint[2]:
+                yield f'<lastmod>{fingerprint[2]}</lastmod>'
+            yield '</sitemap>\n'
+    yield '</sitemapindex>\n'
+
+
+def load_manifest(root):
+    try:
+        with open(root / MANIFEST, encoding='utf-8') as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return {}
+
+
+def refresh_sitemaps(force=False):
+    """
+    Перестраивает шарды, чей отпечаток изменился, и индекс.
+
+    Возвращает имена перезаписанных и удалённых файлов шардов или
+    None, если карту сайта сейчас перестраивает другой процесс.
+    """
+    root = get_root()
+    root.mkdir(parents=True, exist_ok=True)
+    with open(root / LOCK, 'w') as lock:
+        if not locks.lock(lock, locks.LOCK_EX | locks.LOCK_NB):
+            return None
+        try:
+            return _refresh(root, force)
+        finally:
+            locks.unlock(lock)
+
+
+def _refresh(root, force):
+    old = {} if force else load_manifest(root)
+    manifest = {}
+    changed = []
+    for name, section in SECTIONS.items():
+        fingerprints = section.get_fingerprints(settings.SITEMAP_SHARD_SIZE)
+        manifest[name] = fingerprints
+        previous = old.get(name, {})
+        for shard, fingerprint in fingerprints.items():
+            filename = get_shard_filename(name, shard)
+            if (
+                previous.get(shard) == fingerprint
+                and (root / filename).exists()
+            ):
+                continue
+            write_atomic(root / filename, render_shard(section, int(shard)))
+            changed.append(filename)
+        for shard in set(previous) - set(fingerprints):
+            filename = get_shard_filename(name, shard)
+            (root / filename).unlink(missing_ok=True)
+            changed.append(filename)
+    if changed or manifest != old or not (root / INDEX).exists():
+        write_atomic(root / INDEX, render_index(manifest))
+        write_atomic(root / MANIFEST, [json.dumps(manifest)])
+    return changed
@@ -0,0 +1,74 @@
+import hashlib
+import os
+import tempfile
+
+from django.core.files.storage import FileSystemStorage
+from django.utils.deconstruct import deconstructible
+
+# Уровни каталогов по префиксу хеша: ab/cd/abcd….jpg
+SHARD_LEVELS = 2
+SHARD_WIDTH = 2
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    Хранилище, в котором имя файла — sha256 его содержимого.
+
+    Хеш считается, пока загрузка пишется во временный файл, затем файл
+    переносится в каталог по первым символам хеша. Одинаковые файлы
+    хранятся один раз: повторная загрузка возвращает имя уже
+    сохранённого. Каждая загрузка учитывается в счётчике ссылок
+    StoredImage, а удаляет файл только release_image() из
+    blog/images.py, когда ссылок не осталось.
+    """
+
+    def get_available_name(self, name, max_length=None):
+        # Имя определяется содержимым, совпадение означает тот же файл
+        return name
+
+    def get_hashed_name(self, name, digest):
+        directory, filename = os.path.split(name)
+        extension = os.path.splitext(filename)[1].lower()
+        shards = [
+            digest[level * SHARD_WIDTH:(level + 1) * SHARD_WIDTH]
+            for level in range(SHARD_LEVELS)
+        ]
+        return '/'.join(
+            part for part in (directory, *shards, digest + extension) if part
+        )
+
+    def _save(self, name, content):
+        # Модели импортируют это хранилище, поэтому импорт отложен
+        from .images import claim_image
+
+        os.makedirs(self.location, exist_ok=True)
+        digest = hashlib.sha256()
+        fd, temp_path = tempfile.mkstemp(dir=self.location, suffix='.upload')
+        try:
+            with os.fdopen(fd, 'wb') as file:
+                for chunk in content.chunks():
+                    if isinstance(chunk, str):
+                        chunk = chunk.encode()
+                    digest.update(chunk)
+                    file.write(chunk)
+            name = self.get_hashed_name(name, digest.hexdigest())
+            # Ссылка учитывается до проверки наличия файла: иначе его
+            # могут удалить между проверкой и коммитом поста
+            claim_image(name)
+            full_path = self.path(name)
+            if os.path.exists(full_path):
+                os.remove(temp_path)
+                return name
+            os.makedirs(os.path.dirname(full_path), exist_ok=True)
+            if self.file_permissions_mode is not None:
+                os.chmod(temp_path, self.file_permissions_mode)
+            os.replace(temp_path, full_path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        return name
+
+
+post_image_storage = ContentAddressedStorage()
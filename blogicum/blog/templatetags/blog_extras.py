@@ -0,0 +1,20 @@
+from django import template
+
+from blog.images import get_variants
+from blog.search import highlight as highlight_snippet
+
+register = template.Library()
+
+
+@register.filter
+def highlight(snippet):
+    """Фрагмент результата поиска с выделенными совпадениями"""
+    return highlight_snippet(snippet)
+
+
+@register.filter
+def image_srcset(post, image_format):
+    """Значение srcset из готовых копий картинки поста или пустая строка"""
+    return ', '.join(
+        f'{url} {width}w' for url, width in get_variants(post, image_format)
+    )
@@ -1,6 +1,6 @@
 from django.urls import path
 
-from . import views
+from . import feeds, views
 
 app_name = 'blog'
 
@@ -10,6 +10,45 @@ urlpatterns = [
         'posts/<int:id>/', views.PostDetailView.as_view(),
         name='post_detail'
     ),
+    path(
+        'posts/<int:post_id>/comments/',
+        views.CommentListView.as_view(),
+        name='comments'
+    ),
+    path('feeds/rss/', feeds.LatestPostsFeed(), name='feed_rss'),
+    path('feeds/atom/', feeds.LatestPostsAtomFeed(), name='feed_atom'),
+    path(
+        'feeds/category/<slug:category_slug>/rss/',
+        feeds.CategoryFeed(),
+        name='category_feed_rss'
+    ),
+    path(
+        'feeds/category/<slug:category_slug>/atom/',
+        feeds.CategoryAtomFeed(),
+        name='category_feed_atom'
+    ),
+    path(
+        'feeds/author/<str:username>/rss/',
+        feeds.AuthorFeed(),
+        name='author_feed_rss'
+    ),
+    path(
+        'feeds/author/<str:username>/atom/',
+        feeds.AuthorAtomFeed(),
+        name='author_feed_atom'
+    ),
+    path('sitemap.xml', views.SitemapView.as_view(), name='sitemap'),
+    path(
+        'sitemaps/<slug:section>-<int:shard>.xml',
+        views.SitemapView.as_view(),
+        name='sitemap_section'
+    ),
+    path('search/', views.SearchView.as_view(), name='search'),
+    path(
+        'autocomplete/<str:kind>/',
+        views.AutocompleteView.as_view(),
+        name='autocomplete'
+    ),
     path(
         'category/<slug:category_slug>/',
         views.CategoryPostsView.as_view(), name='category_posts'
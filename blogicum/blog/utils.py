@@ -1,6 +1,13 @@
+from django.conf import settings
+from django.db import connection
+from django.db.models import F, FloatField, Q, TextField, Value
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Substr
 from django.utils import timezone
 
 from .models import Post
+from .paginators import KeysetPaginator
+from .search import build_match_query, get_terms, snippet_sql
 
 
 def get_filter_posts(
@@ -9,10 +16,83 @@ def get_filter_posts(
         category_is_published=True):
     if pub_date_lte is None:
         pub_date_lte = timezone.now()
-    return Post.objects.select_related(
+    queryset = Post.objects.select_related(
         'author', 'category', 'location'
-    ).filter(
-        is_published=is_published,
-        pub_date__lte=pub_date_lte,
-        category__is_published=category_is_published,
-    ).order_by('-pub_date')
+    )
+    if is_published and category_is_published:
+        # Флаг is_visible поддерживается сигналами, поэтому для
+        # публичных лент не нужно условие по таблице категорий.
+        queryset = queryset.filter(
+            is_visible=True,
+            pub_date__lte=pub_date_lte,
+        )
+    else:
+        queryset = queryset.filter(
+            is_published=is_published,
+            pub_date__lte=pub_date_lte,
+            category__is_published=category_is_published,
+        )
+    return queryset.order_by('-pub_date', '-id')
+
+
+def get_readable_posts(user):
+    """Посты, которые может открыть пользователь: видимые и свои"""
+    return Post.objects.filter(
+        Q(is_visible=True, pub_date__lte=timezone.now())
+        | Q(author_id=user.pk)
+    )
+
+
+def get_profile_posts(profile, user):
+    """Посты профиля: автору — все, остальным — опубликованные"""
+    queryset = Post.objects.select_related(
+        'author', 'category', 'location'
+    ).filter(author=profile)
+    if user != profile:
+        queryset = queryset.filter(is_published=True)
+    return queryset.order_by('-pub_date')
+
+
+def get_comment_page(post, cursor=None):
+    """Порция комментариев поста в порядке добавления"""
+    paginator = KeysetPaginator(
+        post.comments.select_related('author'),
+        settings.COMMENTS_PER_PAGE,
+        keys=('created_at', 'id'),
+        descending=False,
+    )
+    return paginator.get_page(cursor)
+
+
+def search_posts(query):
+    """
+    Видимые посты, подходящие под запрос, от более к менее релевантным.
+
+    Каждый пост получает rank (меньше — лучше) и snippet — фрагмент
+    текста с отмеченными совпадениями. Без FTS5 (не SQLite) посты
+    ищутся по вхождению всех слов и не ранжируются.
+    """
+    queryset = get_filter_posts()
+    match = build_match_query(query)
+    if match is None:
+        # Аннотации нужны пагинатору и для пустой выдачи
+        queryset = queryset.none().annotate(
+            rank=Value(0.0, output_field=FloatField()),
+            snippet=Value('', output_field=TextField()),
+        )
+    elif connection.vendor != 'sqlite':
+        condition = Q()
+        for term in get_terms(query):
+            condition &= Q(title__icontains=term) | Q(text__icontains=term)
+        queryset = queryset.filter(condition).annotate(
+            rank=Value(0.0, output_field=FloatField()),
+            snippet=Substr('text', 1, 200),
+        )
+    else:
+        queryset = queryset.filter(
+            search_index__document__match=match
+        ).annotate(
+            rank=F('search_index__rank'),
+            snippet=RawSQL(snippet_sql(), ()),
+        )
+    return queryset.order_by('rank', 'id')
@@ -1,32 +1,39 @@
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib.auth.models import User
 from django.core.exceptions import PermissionDenied
-from django.core.paginator import Paginator
-from django.db.models import Count
-from django.http import Http404
-from django.shortcuts import get_object_or_404, render
+from django.http import FileResponse, Http404, JsonResponse
+from django.shortcuts import get_object_or_404
 from django.urls import reverse, reverse_lazy
-from django.utils import timezone
-from django.views import View
+from django.utils.http import urlencode
 from django.views.generic import (
-    CreateView, DeleteView, DetailView, UpdateView, ListView
+    CreateView, DeleteView, DetailView, UpdateView, ListView, TemplateView,
+    View
 )
 
+from .autocomplete import KINDS, autocomplete
 from .forms import PostForm, CommentForm
 from .models import Post, Category, Comment
-from .utils import get_filter_posts
+from .sitemaps import INDEX, SECTIONS, get_root, get_shard_filename
+from .utils import (
+    get_comment_page, get_filter_posts, get_profile_posts,
+    get_readable_posts, search_posts
+)
 from .mixins import (
-    UserPassesTestMixin,
     UserCanDeleteMixin,
     AuthorRequiredMixin,
-    OnlyAuthorMixin
+    ConditionalGetMixin,
+    FeedConditionalGetMixin,
+    FeedPaginationMixin,
+    OnlyAuthorMixin,
+    SingleObjectCacheMixin,
 )
 
 
 PAGINATOR_DIRS = 10
 
 
-class PostListView(ListView):
+class PostListView(
+        FeedConditionalGetMixin, FeedPaginationMixin, ListView):
     """Класс отображения постов в блоге"""
 
     model = Post
@@ -39,10 +46,13 @@ class PostListView(ListView):
         category = self.request.GET.get('category')
         if category:
             queryset = queryset.filter(category__name=category)
-        return queryset.annotate(comment_count=Count('comments'))
+        return queryset
+
+    def get_count_cache_key(self):
+        return 'index:{}'.format(self.request.GET.get('category', ''))
 
 
-class PostDetailView(DetailView):
+class PostDetailView(ConditionalGetMixin, DetailView):
     """Представление для отображения детальной информации о посте"""
 
     model = Post
@@ -50,50 +60,148 @@ class PostDetailView(DetailView):
     context_object_name = 'post'
     pk_url_kwarg = 'id'
 
-    def get(self, request, *args, **kwargs):
-        post = self.get_object()
+    def get_queryset(self):
+        # Правило видимости проверяется в том же запросе, что и загрузка
+        return get_readable_posts(self.request.user).select_related(
+            'author', 'category', 'location'
+        )
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['comments'] = get_comment_page(
+            self.object, self.request.GET.get('cursor')
+        )
+        context['form'] = CommentForm()
+        return context
+
+    def get_validator_objects(self, context):
+        post = context['post']
+        return (post, post.category, post.location)
+
+    def get_validator_extra(self, context):
+        yield context['post'].author.username
+        # Правки комментариев меняют Post.updated_at, поэтому
+        # достаточно состава и авторов текущих комментариев.
+        yield [
+            (comment.pk, comment.author.username)
+            for comment in context['comments']
+        ]
+
+    def get_last_modified(self, context):
+        return max(
+            obj.updated_at
+            for obj in self.get_validator_objects(context) if obj is not None
+        )
+
 
-        if (
-            not post.is_published
-            or post.pub_date > timezone.now()
-            or not post.category.is_published
-        ) and post.author != request.user:
-            raise Http404("Пост не найден или доступен только автору.")
+class CommentListView(TemplateView):
+    """Следующая порция комментариев поста для кнопки «Показать ещё»"""
 
-        return super().get(request, *args, **kwargs)
+    template_name = 'includes/comment_list.html'
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        comments = Comment.objects.filter(
-            post=self.object
-        ).order_by('created_at')
-        context['comments'] = comments
-        context['form'] = CommentForm()
+        post = get_object_or_404(
+            get_readable_posts(self.request.user), pk=self.kwargs['post_id']
+        )
+        context['post'] = post
+        context['comments'] = get_comment_page(
+            post, self.request.GET.get('cursor')
+        )
         return context
 
 
-class CategoryPostsView(View):
+class CategoryPostsView(
+        FeedConditionalGetMixin, FeedPaginationMixin, ListView):
     """Класс категории постов"""
 
     template_name = 'blog/category.html'
+    context_object_name = 'posts'
     paginate_by = PAGINATOR_DIRS
 
-    def get(self, request, category_slug):
-        category = get_object_or_404(
-            Category, slug=category_slug, is_published=True
+    def get_queryset(self):
+        self.category = get_object_or_404(
+            Category, slug=self.kwargs['category_slug'], is_published=True
         )
-        posts = Post.objects.filter(
-            category=category,
-            is_published=True,
-            category__is_published=True,
-            pub_date__lte=timezone.now()
+        return get_filter_posts().filter(category=self.category)
+
+    def get_count_cache_key(self):
+        return f'category:{self.category.pk}'
+
+    def get_validator_objects(self, context):
+        yield self.category
+        yield from super().get_validator_objects(context)
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['category'] = self.category
+        return context
+
+
+class SearchView(FeedPaginationMixin, ListView):
+    """Полнотекстовый поиск по заголовкам и текстам постов"""
+
+    template_name = 'blog/search.html'
+    context_object_name = 'posts'
+    paginate_by = PAGINATOR_DIRS
+    search_kwarg = 'q'
+    keyset_keys = ('rank', 'id')
+    keyset_descending = False
+
+    def get_query(self):
+        return self.request.GET.get(self.search_kwarg, '').strip()
+
+    def use_keyset_pagination(self):
+        # Номер страницы для выдачи по релевантности не поддерживается
+        return True
+
+    def get_queryset(self):
+        return search_posts(self.get_query())
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        query = self.get_query()
+        context['query'] = query
+        context['pagination_query'] = (
+            urlencode({self.search_kwarg: query}) + '&' if query else ''
         )
-        paginator = Paginator(posts, self.paginate_by)
-        page_number = request.GET.get('page')
-        page_obj = paginator.get_page(page_number)
+        return context
+
+
+class AutocompleteView(View):
+    """Подходящие под ввод категории, местоположения или авторы"""
+
+    def get(self, request, kind):
+        if kind not in KINDS:
+            raise Http404
+        results = autocomplete(kind, request.GET.get('q', ''))
+        return JsonResponse({
+            'results': [
+                {'id': pk, 'text': label} for pk, label in results
+            ],
+        })
 
-        context = {'category': category, 'page_obj': page_obj}
-        return render(request, self.template_name, context)
+
+class SitemapView(View):
+    """
+    Индекс и шарды карты сайта из файлов на диске.
+
+    Файлы перестраивает команда build_sitemaps, запускаемая по
+    расписанию (cron), а не запросы посетителей.
+    """
+
+    def get(self, request, section=None, shard=None):
+        if section is None:
+            filename = INDEX
+        elif section in SECTIONS:
+            filename = get_shard_filename(section, shard)
+        else:
+            raise Http404
+        try:
+            file = open(get_root() / filename, 'rb')
+        except FileNotFoundError:
+            raise Http404
+        return FileResponse(file, content_type='application/xml')
 
 
 class PostCreateView(LoginRequiredMixin, CreateView):
@@ -129,26 +237,28 @@ class EditPostView(AuthorRequiredMixin, OnlyAuthorMixin, UpdateView):
 class DeletePostView(AuthorRequiredMixin, OnlyAuthorMixin, DeleteView):
     """Класс удаления поста"""
 
-    model = Post
+    queryset = Post.objects.select_related('location')
     pk_url_kwarg = 'post_id'
     template_name = 'blog/create.html'
     success_url = reverse_lazy('blog:index')
 
 
-class CommentPostView(UpdateView):
+class CommentPostView(SingleObjectCacheMixin, UpdateView):
     """Класс для обновления определенного комментария к заданному посту"""
 
     model = Comment
+    pk_url_kwarg = 'comment_id'
     form_class = CommentForm
     template_name = 'blog/create.html'
     success_url = reverse_lazy('blog:index')
 
+    def get_queryset(self):
+        return Comment.objects.filter(post_id=self.kwargs['post_id'])
+
     def get_object(self, queryset=None):
-        post_id = self.kwargs['post_id']
-        comment_id = self.kwargs['comment_id']
-        comment = get_object_or_404(Comment, pk=comment_id, post_id=post_id)
+        comment = super().get_object(queryset)
 
-        if comment.author != self.request.user:
+        if comment.author_id != self.request.user.pk:
             raise PermissionDenied(
                 "Вы не можете редактировать чужие комментарии."
             )
@@ -160,7 +270,8 @@ class CommentPostView(UpdateView):
         return super().form_valid(form)
 
 
-class ProfileDetailView(ListView):
+class ProfileDetailView(
+        FeedConditionalGetMixin, FeedPaginationMixin, ListView):
     """Представление для отображения профиля пользователя с его постами"""
 
     template_name = 'blog/profile.html'
@@ -169,14 +280,18 @@ class ProfileDetailView(ListView):
 
     def get_queryset(self):
         self.user = get_object_or_404(User, username=self.kwargs['username'])
-        queryset = Post.objects.filter(author=self.user)
+        return get_profile_posts(self.user, self.request.user)
 
-        if self.request.user != self.user:
-            queryset = queryset.filter(is_published=True)
+    def get_count_cache_key(self):
+        audience = 'owner' if self.request.user == self.user else 'public'
+        return f'profile:{self.user.pk}:{audience}'
 
-        return queryset.annotate(
-            comment_count=Count('comments')
-        ).order_by('-pub_date')
+    def get_validator_extra(self, context):
+        yield from super().get_validator_extra(context)
+        yield (
+            self.user.username, self.user.get_full_name(),
+            self.user.is_staff, self.user.date_joined,
+        )
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -221,10 +336,6 @@ class PostDeleteView(LoginRequiredMixin, UserCanDeleteMixin, DeleteView):
     template_name = 'blog/delete.html'
     success_url = reverse_lazy('blog:index')
 
-    def test_func(self):
-        post = self.get_object()
-        return post.author == self.request.user
-
 
 class CommentCreateView(LoginRequiredMixin, CreateView):
     """Представление для создания нового комментария к посту"""
@@ -254,24 +365,19 @@ class CommentCreateView(LoginRequiredMixin, CreateView):
         return Comment.objects.filter(post=post).order_by('-created')
 
 
-class CommentDeleteView(LoginRequiredMixin, UserPassesTestMixin, DeleteView):
+class CommentDeleteView(LoginRequiredMixin, UserCanDeleteMixin, DeleteView):
     """Представление для удаления комментария"""
 
     model = Comment
+    pk_url_kwarg = 'comment_id'
     template_name = 'blog/comment.html'
     context_object_name = 'comment'
 
+    def get_queryset(self):
+        return Comment.objects.filter(post_id=self.kwargs['post_id'])
+
     def get_success_url(self):
         return reverse_lazy(
             'blog:post_detail',
-            kwargs={'id': self.get_object().post_id}
+            kwargs={'id': self.object.post_id}
         )
-
-    def get_object(self):
-        comment_id = self.kwargs['comment_id']
-        post_id = self.kwargs['post_id']
-        return get_object_or_404(Comment, id=comment_id, post_id=post_id)
-
-    def test_func(self):
-        obj = self.get_object()
-        return obj.author == self.request.user
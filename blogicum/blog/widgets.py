@@ -0,0 +1,42 @@
+from django import forms
+from django.urls import reverse
+
+
+class AutocompleteSelect(forms.Select):
+    """
+    Выпадающий список, который выводит только выбранный вариант.
+
+    Остальные варианты подгружает скрипт autocomplete.js по мере ввода
+    из представления blog:autocomplete, поэтому страница формы не
+    зависит от размера таблицы.
+    """
+
+    class Media:
+        js = ('js/autocomplete.js',)
+
+    def __init__(self, kind, attrs=None):
+        super().__init__(attrs)
+        self.kind = kind
+
+    def get_context(self, name, value, attrs):
+        attrs = dict(attrs or {})
+        attrs['data-autocomplete-url'] = reverse(
+            'blog:autocomplete', args=(self.kind,)
+        )
+        return super().get_context(name, value, attrs)
+
+    def optgroups(self, name, value, attrs=None):
+        selected = [str(item) for item in value if item]
+        field = self.choices.field
+        choices = [('', field.empty_label or '')] if field.empty_label else []
+        choices.extend(
+            (obj.pk, field.label_from_instance(obj))
+            for obj in field.queryset.filter(pk__in=selected)
+        )
+        groups = []
+        for index, (option_value, label) in enumerate(choices):
+            groups.append((None, [self.create_option(
+                name, option_value, label,
+                str(option_value) in selected, index, attrs=attrs,
+            )], index))
+        return groups
@@ -34,6 +34,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'blog.middleware.QueryBudgetMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -41,6 +42,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'blog.middleware.AnonymousPageCacheMiddleware',
 ]
 
 ROOT_URLCONF = 'blogicum.urls'
@@ -78,6 +80,16 @@ DATABASES = {
 }
 
 
+# Кеш должен быть общим для всех процессов: версии кеша сбрасывают и
+# веб-процессы, и management-команды. В продакшене — Redis или Memcached
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / 'cache',
+    }
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
 
@@ -138,3 +150,107 @@ EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 EMAIL_FILE_PATH = BASE_DIR / 'sent_emails'
 
 PAGINATOR_DIRS = 10
+
+# Окно ссылок пагинатора: соседей текущей страницы и страниц у краёв
+PAGINATOR_ON_EACH_SIDE = 2
+PAGINATOR_ON_ENDS = 1
+
+# Количество комментариев в одной порции на странице поста
+COMMENTS_PER_PAGE = 20
+
+# Курсорная пагинация лент; ссылки ?page=N продолжают работать
+KEYSET_PAGINATION = True
+
+# Время жизни кешированного количества постов в ленте, в секундах
+FEED_COUNT_CACHE_TIMEOUT = 60
+
+# Порог приблизительного подсчёта постов; None — точный подсчёт
+FEED_COUNT_LIMIT = None
+
+# Время жизни кешированной карточки поста, в секундах
+POST_CARD_CACHE_TIMEOUT = 600
+
+# Время жизни страниц в кеше для анонимных посетителей, по имени маршрута
+PAGE_CACHE_TIMEOUTS = {
+    'blog:index': 30,
+    'blog:post_detail': 60,
+    'blog:comments': 60,
+    'blog:category_posts': 60,
+    'blog:profile': 60,
+    'blog:search': 30,
+    'blog:autocomplete': 60,
+    'pages:about': 3600,
+    'pages:rules': 3600,
+}
+
+# Ленты, которые не кешируются дольше, чем до публикации ближайшего
+# отложенного поста
+VISIBILITY_HORIZON_VIEWS = {
+    'blog:index',
+    'blog:category_posts',
+    'blog:profile',
+    'blog:search',
+}
+
+# Бюджет SQL-запросов на один запрос по имени маршрута
+QUERY_BUDGETS = {
+    'blog:index': 6,
+    'blog:post_detail': 4,
+    'blog:comments': 5,
+    'blog:category_posts': 7,
+    'blog:profile': 7,
+    'blog:search': 3,
+    'blog:autocomplete': 3,
+    'blog:create_post': 11,
+    'blog:edit_post': 11,
+    'blog:delete_post': 12,
+    'blog:comment': 10,
+    'blog:edit_comment': 6,
+    'blog:delete_comment': 6,
+    'blog:edit_profile': 6,
+    'blog:feed_rss': 3,
+    'blog:feed_atom': 3,
+    'blog:category_feed_rss': 4,
+    'blog:category_feed_atom': 4,
+    'blog:author_feed_rss': 4,
+    'blog:author_feed_atom': 4,
+    'api_v1:posts': 3,
+    'api_v1:post_detail': 4,
+    'api_v1:category_posts': 4,
+    'api_v1:profile': 4,
+    'pages:about': 2,
+    'pages:rules': 2,
+}
+QUERY_BUDGET_DEFAULT = None
+# Лимит суммарного времени SQL на один запрос, в секундах
+QUERY_TIME_BUDGET = 0.5
+# Доля проверяемых запросов; в продакшене достаточно малой выборки
+QUERY_BUDGET_SAMPLE_RATE = 1.0 if DEBUG else 0.01
+QUERY_BUDGET_RAISE = DEBUG
+
+# Автодополнение вместо выпадающего списка для таблиц больше порога
+AUTOCOMPLETE_THRESHOLD = 100
+AUTOCOMPLETE_LIMIT = 10
+AUTOCOMPLETE_COUNT_CACHE_TIMEOUT = 300
+
+# Размер страницы JSON API по умолчанию и его верхняя граница
+API_PAGE_SIZE = 10
+API_MAX_PAGE_SIZE = 100
+
+# Лента RSS/Atom: число записей и время жизни закешированной ленты
+FEED_ITEMS = 20
+FEED_CACHE_TIMEOUT = 600
+
+# Адрес сайта для абсолютных ссылок, которые строятся вне запроса
+SITE_URL = 'http://127.0.0.1:8000'
+
+# Карта сайта: файлы на диске, шарды по диапазонам id
+SITEMAP_ROOT = BASE_DIR / 'sitemaps'
+SITEMAP_SHARD_SIZE = 10000
+SITEMAP_CHUNK_SIZE = 2000
+
+# Уменьшенные копии картинок постов; 0 процессов — обработка на месте
+IMAGE_WORKERS = 2
+IMAGE_VARIANT_WIDTHS = (320, 640, 1280)
+IMAGE_VARIANT_FORMATS = ('webp', 'jpeg')
+IMAGE_VARIANT_QUALITY = 80
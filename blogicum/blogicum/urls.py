@@ -8,6 +8,7 @@ from django.views.generic import CreateView
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('pages/', include('pages.urls', namespace='pages')),
+    path('api/v1/', include('blog.api_urls', namespace='api_v1')),
     path('', include('blog.urls', namespace='blog')),
     path('auth/', include('django.contrib.auth.urls')),
     path(
@@ -0,0 +1,31 @@
+// Автодополнение для <select data-autocomplete-url>: поле ввода над
+// списком запрашивает подходящие варианты и подменяет ими список.
+document.addEventListener('DOMContentLoaded', function () {
+  document.querySelectorAll('select[data-autocomplete-url]').forEach(function (select) {
+    var input = document.createElement('input');
+    var timer = null;
+    input.type = 'search';
+    input.className = 'form-control mb-1';
+    input.placeholder = 'Начните вводить название';
+    select.parentNode.insertBefore(input, select);
+
+    input.addEventListener('input', function () {
+      clearTimeout(timer);
+      timer = setTimeout(function () {
+        var url = select.dataset.autocompleteUrl + '?q=' + encodeURIComponent(input.value);
+        fetch(url, {headers: {'Accept': 'application/json'}})
+          .then(function (response) { return response.json(); })
+          .then(function (data) {
+            Array.from(select.options).forEach(function (option) {
+              if (option.value && !option.selected) option.remove();
+            });
+            data.results.forEach(function (item) {
+              if (!select.querySelector('option[value="' + item.id + '"]')) {
+                select.add(new Option(item.text, item.id));
+              }
+            });
+          });
+      }, 200);
+    });
+  });
+});
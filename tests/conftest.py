@@ -41,6 +41,22 @@ def enable_debug_false():
         yield
 
 
+@pytest.fixture(autouse=True)
+def isolate_media(settings, tmp_path):
+    """Картинки и их копии пишутся во временный каталог и без пула"""
+    settings.IMAGE_WORKERS = 0
+    settings.MEDIA_ROOT = tmp_path / 'media'
+    yield
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    from django.core.cache import cache
+    cache.clear()
+    yield
+    cache.clear()
+
+
 class SafeImportFromContextManager:
     def __init__(
             self,
@@ -0,0 +1,127 @@
+import json
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from conftest import N_PER_PAGE
+
+pytestmark = [pytest.mark.django_db]
+
+
+def get_json(client, url, **params):
+    response = client.get(url, params)
+    assert response.status_code == 200, response
+    assert response.streaming, (
+        'Убедитесь, что API отдаёт ответ потоком.'
+    )
+    return json.loads(b''.join(response.streaming_content))
+
+
+def walk(client, url, **params):
+    ids = []
+    data = get_json(client, url, **params)
+    while True:
+        ids.extend(item['id'] for item in data['results'])
+        if not data['next']:
+            return ids
+        response = client.get(data['next'])
+        data = json.loads(b''.join(response.streaming_content))
+
+
+def test_api_feeds_match_html(
+        user, user_client, unlogged_client, published_category,
+        many_posts_with_published_locations):
+    from blog.utils import get_filter_posts
+
+    expected = list(get_filter_posts().values_list('id', flat=True))
+    for url in (
+        '/api/v1/posts/',
+        f'/api/v1/category/{published_category.slug}/',
+        f'/api/v1/profile/{user.username}/',
+    ):
+        assert walk(unlogged_client, url, limit=3) == expected, (
+            f'Убедитесь, что `{url}` выдаёт те же посты, что и HTML-лента, '
+            'и проходит их курсором целиком.'
+        )
+
+
+def test_api_sparse_fields(unlogged_client, post_with_published_location):
+    post = post_with_published_location
+    with CaptureQueriesContext(connection) as captured:
+        data = get_json(unlogged_client, '/api/v1/posts/', fields='id,title')
+    assert data['results'] == [{'id': post.id, 'title': post.title}]
+    assert len(captured) == 1
+    sql = captured.captured_queries[0]['sql']
+    assert '"text"' not in sql and 'auth_user' not in sql, (
+        'Убедитесь, что API выбирает из базы только запрошенные поля.'
+    )
+
+    full = get_json(unlogged_client, '/api/v1/posts/')['results'][0]
+    assert full['author'] == post.author.username
+    assert full['category']['slug'] == post.category.slug
+    assert full['location'] == post.location.name
+
+    bad = unlogged_client.get('/api/v1/posts/', {'fields': 'password'})
+    assert bad.status_code == 400
+
+
+def test_api_post_detail(
+        user_client, another_user_client, unlogged_client, mixer,
+        post_with_published_location):
+    post = post_with_published_location
+    mixer.cycle(N_PER_PAGE // 2).blend(
+        'blog.Comment', post=post, author=post.author
+    )
+    data = get_json(unlogged_client, f'/api/v1/posts/{post.id}/')
+    assert data['result']['id'] == post.id
+    assert len(data['comments']) == N_PER_PAGE // 2
+
+    post.is_published = False
+    post.save()
+    assert another_user_client.get(
+        f'/api/v1/posts/{post.id}/'
+    ).status_code == 404, (
+        'Убедитесь, что API не отдаёт скрытые посты другим пользователям.'
+    )
+    assert get_json(user_client, f'/api/v1/posts/{post.id}/')['result']
+
+
+def test_api_image_url_uses_field_storage(
+        monkeypatch, user_client, post_with_published_location):
+    from blog.models import Post
+
+    post = post_with_published_location
+    Post.objects.filter(pk=post.pk).update(image='posts/ab/cd/abcd.jpg')
+    storage = Post._meta.get_field('image').storage
+    monkeypatch.setattr(storage, 'url', lambda name: f'/cdn/{name}')
+    data = get_json(user_client, f'/api/v1/posts/{post.id}/', fields='image')
+    assert data['result']['image'] == (
+        'http://testserver/cdn/posts/ab/cd/abcd.jpg'
+    ), 'Убедитесь, что адрес картинки строит хранилище поля image.'
+
+
+def test_api_profile_hides_unpublished_from_others(
+        mixer, user, user_client, another_user_client, published_category):
+    visible = mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        pub_date=timezone.now() - timedelta(days=1), is_published=True,
+    )
+    scheduled = mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        pub_date=timezone.now() + timedelta(days=1), is_published=True,
+    )
+    hidden_category = mixer.blend(
+        'blog.Post', author=user, pub_date=timezone.now(), is_published=True,
+        category=mixer.blend('blog.Category', is_published=False),
+    )
+    url = f'/api/v1/profile/{user.username}/'
+    assert walk(another_user_client, url, limit=3) == [visible.id], (
+        'Убедитесь, что чужой профиль в API не показывает отложенные '
+        'посты и посты скрытых категорий.'
+    )
+    assert set(walk(user_client, url, limit=3)) == {
+        visible.id, scheduled.id, hidden_category.id
+    }, 'Убедитесь, что автор видит в API все свои посты.'
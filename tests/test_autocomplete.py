@@ -0,0 +1,90 @@
+import pytest
+from django.db import connection
+from django.test import override_settings
+
+pytestmark = [
+    pytest.mark.django_db,
+    pytest.mark.skipif(
+        connection.vendor != 'sqlite', reason='Индекс FTS5 есть в SQLite'
+    ),
+]
+
+
+def suggest(client, kind, query):
+    response = client.get(f'/autocomplete/{kind}/', {'q': query})
+    assert response.status_code == 200
+    return [item['text'] for item in response.json()['results']]
+
+
+def test_autocomplete_matches_and_follows_changes(mixer, unlogged_client):
+    mixer.blend('blog.Category', title='Поездки и путешествия')
+    category = mixer.blend('blog.Category', title='Путешествия')
+    mixer.blend('blog.Category', title='Путешествия тайные',
+                is_published=False)
+
+    assert suggest(unlogged_client, 'category', 'путеш') == [
+        'Путешествия', 'Поездки и путешествия'
+    ], (
+        'Убедитесь, что автодополнение находит названия по подстроке '
+        'без учёта регистра, ставит первыми совпадения с начала названия '
+        'и не показывает снятые с публикации категории.'
+    )
+    assert suggest(unlogged_client, 'category', 'Пу') == ['Путешествия']
+
+    category.title = 'Туризм'
+    category.save()
+    assert suggest(unlogged_client, 'category', 'туриз') == ['Туризм']
+    category.delete()
+    assert suggest(unlogged_client, 'category', 'туриз') == [], (
+        'Убедитесь, что индекс автодополнения обновляется вместе '
+        'с таблицей.'
+    )
+
+
+def test_autocomplete_kinds(mixer, user, unlogged_client):
+    mixer.blend('blog.Location', name='Остров отчаянья')
+    assert suggest(unlogged_client, 'location', 'остров') == [
+        'Остров отчаянья'
+    ]
+    assert user.username in suggest(
+        unlogged_client, 'author', user.username[:4]
+    )
+    assert suggest(unlogged_client, 'category', '') == []
+    assert unlogged_client.get('/autocomplete/post/').status_code == 404
+
+
+@override_settings(AUTOCOMPLETE_THRESHOLD=0)
+def test_post_form_switches_to_autocomplete(
+        mixer, user_client, published_category, published_location):
+    other = mixer.blend('blog.Location', name='Не выбранное место')
+    content = user_client.get('/posts/create/').content.decode()
+    assert 'data-autocomplete-url="/autocomplete/location/"' in content, (
+        'Убедитесь, что для больших таблиц форма поста использует '
+        'автодополнение.'
+    )
+    assert other.name not in content, (
+        'Убедитесь, что виджет автодополнения не выводит все варианты.'
+    )
+
+    response = user_client.post('/posts/create/', {
+        'title': 'Заголовок',
+        'text': 'Текст',
+        'pub_date': '2020-01-01T00:00',
+        'category': published_category.pk,
+        'location': other.pk,
+    })
+    assert response.status_code == 302
+
+
+@override_settings(AUTOCOMPLETE_THRESHOLD=0)
+def test_admin_uses_autocomplete(mixer, admin_client):
+    category = mixer.blend('blog.Category', title='Скрытая категория',
+                           is_published=False)
+    response = admin_client.get('/admin/blog/category/', {'q': 'скрытая'})
+    assert list(response.context['cl'].result_list) == [category]
+
+    response = admin_client.get('/admin/blog/post/add/')
+    assert 'admin-autocomplete' in response.content.decode(), (
+        'Убедитесь, что админка поста использует автодополнение '
+        'для больших таблиц.'
+    )
@@ -0,0 +1,70 @@
+import json
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_benchmark_covers_every_route(settings, tmp_path):
+    from blog.benchmarks import get_routes
+
+    settings.SITEMAP_ROOT = tmp_path / 'sitemaps'
+    call_command(
+        'generate_blog_data', posts=100, seed=3, stdout=StringIO()
+    )
+    output = tmp_path / 'results.json'
+    call_command(
+        'benchmark_views', requests=2, warmup=0, output=str(output),
+        stdout=StringIO(), stderr=StringIO(),
+    )
+    report = json.loads(output.read_text(encoding='utf-8'))
+    results = report['results']
+    for name, _ in get_routes():
+        assert name in results, (
+            f'Убедитесь, что маршрут {name} попадает в замер.'
+        )
+    assert results['blog:sitemap_section']['status'] == 200
+    index = results['blog:index']
+    assert index['status'] == 200
+    assert index['p50_ms'] <= index['p95_ms'] <= index['p99_ms']
+    assert index['queries'] > 0 and index['bytes'] > 0
+    assert results['blog:index [anonymous]']['queries'] == 0, (
+        'Убедитесь, что анонимные запросы отдаются из кеша страниц.'
+    )
+    assert 'blog:create_post [anonymous]' not in results
+    assert report['meta']['rows']['blog.post'] == 100
+
+
+def test_benchmark_requires_data():
+    with pytest.raises(CommandError):
+        call_command('benchmark_views', stdout=StringIO())
+
+
+def test_compare_flags_regressions(tmp_path):
+    result = {
+        'status': 200, 'p50_ms': 5.0, 'p95_ms': 10.0, 'p99_ms': 12.0,
+        'queries': 3, 'bytes': 100,
+    }
+    baseline = tmp_path / 'baseline.json'
+    baseline.write_text(json.dumps({'results': {
+        'blog:index': result, 'blog:search': result,
+    }}))
+    current = tmp_path / 'current.json'
+    current.write_text(json.dumps({'results': {
+        'blog:index': {**result, 'p95_ms': 10.5},
+        'blog:search': {**result, 'queries': 4},
+    }}))
+    stderr = StringIO()
+    with pytest.raises(CommandError):
+        call_command(
+            'benchmark_views', load=str(current), compare=str(baseline),
+            stdout=StringIO(), stderr=stderr,
+        )
+    assert 'blog:search' in stderr.getvalue()
+    assert 'blog:index' not in stderr.getvalue(), (
+        'Убедитесь, что небольшие колебания времени не считаются '
+        'регрессией.'
+    )
@@ -0,0 +1,42 @@
+import pytest
+from django.core.management import call_command
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_comment_count_follows_views(
+        user_client, post_with_published_location):
+    post = post_with_published_location
+    user_client.post(f'/posts/{post.id}/comment/', {'text': 'Первый'})
+    user_client.post(f'/posts/{post.id}/comment/', {'text': 'Второй'})
+    post.refresh_from_db()
+    assert post.comment_count == 2, (
+        'Убедитесь, что создание комментария увеличивает '
+        'счётчик `comment_count` поста.'
+    )
+
+    comment = post.comments.first()
+    user_client.post(f'/posts/{post.id}/delete_comment/{comment.id}/')
+    post.refresh_from_db()
+    assert post.comment_count == 1, (
+        'Убедитесь, что удаление комментария уменьшает '
+        'счётчик `comment_count` поста.'
+    )
+
+    post.comments.all().delete()
+    post.refresh_from_db()
+    assert post.comment_count == 0
+
+
+def test_recount_comments_command(mixer, post_with_published_location):
+    post = post_with_published_location
+    mixer.cycle(3).blend('blog.Comment', post=post)
+    type(post).objects.filter(pk=post.pk).update(comment_count=42)
+
+    call_command('recount_comments', batch_size=1)
+
+    post.refresh_from_db()
+    assert post.comment_count == 3, (
+        'Убедитесь, что команда `recount_comments` восстанавливает '
+        'верные значения счётчиков.'
+    )
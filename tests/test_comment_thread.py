@@ -0,0 +1,55 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_comment_thread_is_paginated(
+        settings, mixer, user_client, another_user_client,
+        post_with_published_location):
+    settings.COMMENTS_PER_PAGE = 5
+    post = post_with_published_location
+    comments = mixer.cycle(12).blend('blog.Comment', post=post)
+    url = f'/posts/{post.id}/'
+
+    with CaptureQueriesContext(connection) as few:
+        response = user_client.get(url)
+    page = response.context['comments']
+    assert [c.id for c in page] == [c.id for c in comments[:5]], (
+        'Убедитесь, что на странице поста выводится первая порция '
+        'комментариев в порядке их добавления.'
+    )
+
+    shown = [c.id for c in page]
+    cursor = page.next_cursor
+    while cursor:
+        fragment = another_user_client.get(
+            f'/posts/{post.id}/comments/', {'cursor': cursor}
+        )
+        assert fragment.status_code == 200
+        assert '<html' not in fragment.content.decode(), (
+            'Убедитесь, что адрес подгрузки комментариев возвращает '
+            'только фрагмент списка.'
+        )
+        shown += [c.id for c in fragment.context['comments']]
+        cursor = fragment.context['comments'].next_cursor
+    assert shown == [c.id for c in comments]
+
+    mixer.cycle(20).blend('blog.Comment', post=post)
+    with CaptureQueriesContext(connection) as many:
+        user_client.get(url)
+    assert len(many) == len(few), (
+        'Убедитесь, что число запросов страницы поста не зависит '
+        'от количества комментариев.'
+    )
+
+
+def test_comment_fragment_of_hidden_post(
+        user_client, another_user_client, post_with_published_location):
+    post = post_with_published_location
+    post.is_published = False
+    post.save()
+    url = f'/posts/{post.id}/comments/'
+    assert another_user_client.get(url).status_code == 404
+    assert user_client.get(url).status_code == 200
@@ -0,0 +1,42 @@
+import pytest
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.mark.parametrize('client_fixture', ['user_client', 'unlogged_client'])
+def test_pages_answer_not_modified(
+        request, client_fixture, user, published_category,
+        post_with_published_location):
+    client = request.getfixturevalue(client_fixture)
+    post = post_with_published_location
+    for url in (
+        '/',
+        f'/posts/{post.id}/',
+        f'/category/{published_category.slug}/',
+        f'/profile/{user.username}/',
+    ):
+        # Первый запрос выдаёт CSRF-cookie, от которой зависит страница
+        client.get(url)
+        response = client.get(url)
+        etag = response.get('ETag')
+        assert etag, f'Убедитесь, что страница `{url}` отдаёт ETag.'
+        cached = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert cached.status_code == 304, (
+            f'Убедитесь, что неизменившаяся страница `{url}` '
+            'отдаётся с кодом 304.'
+        )
+
+
+def test_etag_changes_with_content(user_client, post_with_published_location):
+    post = post_with_published_location
+    url = f'/posts/{post.id}/'
+    user_client.get(url)
+    etag = user_client.get(url)['ETag']
+    assert user_client.get(url)['ETag'] == etag
+
+    user_client.post(f'/posts/{post.id}/comment/', {'text': 'Новый'})
+    response = user_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200 and response['ETag'] != etag, (
+        'Убедитесь, что после добавления комментария страница поста '
+        'отдаётся заново.'
+    )
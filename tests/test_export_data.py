@@ -0,0 +1,98 @@
+import gzip
+import json
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_export_in_keyset_chunks(
+        tmp_path, many_posts_with_published_locations,
+        django_assert_max_num_queries):
+    from blog.models import Post
+
+    total = Post.objects.count()
+    # Запрос на каждую порцию, а не на каждую строку
+    with django_assert_max_num_queries(total // 3 + 15):
+        call_command(
+            'export_blog_data', str(tmp_path), chunk_size=3,
+            stdout=StringIO(),
+        )
+    with gzip.open(
+            tmp_path / 'blog.post.jsonl.gz', 'rt', encoding='utf-8') as file:
+        records = [json.loads(line) for line in file]
+    assert [record['pk'] for record in records] == sorted(
+        Post.objects.values_list('pk', flat=True)
+    ), 'Убедитесь, что выгружаются все посты, по возрастанию id.'
+    post = Post.objects.get(pk=records[0]['pk'])
+    assert records[0]['fields']['author'] == post.author_id
+    assert records[0]['fields']['title'] == post.title
+    assert not list(tmp_path.glob('*.tmp'))
+
+
+def test_export_is_importable(tmp_path, post_with_published_location,
+                              comment_to_a_post):
+    from blog.models import Comment, Post
+
+    call_command('export_blog_data', str(tmp_path), stdout=StringIO())
+    posts = list(Post.objects.values().order_by('pk'))
+    comments = list(Comment.objects.values().order_by('pk'))
+    call_command(
+        'import_blog_data', str(tmp_path), clear=True, stdout=StringIO()
+    )
+    assert list(Post.objects.values().order_by('pk')) == posts, (
+        'Убедитесь, что выгрузка загружается обратно без потерь.'
+    )
+    assert list(Comment.objects.values().order_by('pk')) == comments
+
+
+def test_export_skips_credentials(tmp_path, user, django_user_model):
+    call_command('export_blog_data', str(tmp_path), stdout=StringIO())
+    path = tmp_path / f'{django_user_model._meta.label_lower}.jsonl.gz'
+    with gzip.open(path, 'rt', encoding='utf-8') as file:
+        fields = json.loads(file.readline())['fields']
+    assert fields['username'] == user.username
+    assert not {'password', 'email', 'is_superuser'} & fields.keys(), (
+        'Убедитесь, что хеши паролей и почта не выгружаются без '
+        '--include-credentials.'
+    )
+    call_command(
+        'import_blog_data', str(tmp_path), clear=True, stdout=StringIO()
+    )
+    imported = django_user_model.objects.get(pk=user.pk)
+    assert imported.username == user.username
+    assert not imported.has_usable_password()
+
+    call_command(
+        'export_blog_data', str(tmp_path), include_credentials=True,
+        stdout=StringIO(),
+    )
+    with gzip.open(path, 'rt', encoding='utf-8') as file:
+        assert 'password' in json.loads(file.readline())['fields']
+
+
+def test_clear_keeps_staff_accounts(tmp_path, mixer, django_user_model):
+    from blog.models import Post
+
+    admin = django_user_model.objects.create_superuser(
+        'admin', 'admin@example.com', 'secret-password'
+    )
+    mixer.blend('blog.Post', author=admin)
+    author = mixer.blend('auth.User')
+    mixer.blend('blog.Post', author=author)
+    call_command('export_blog_data', str(tmp_path), stdout=StringIO())
+    call_command(
+        'import_blog_data', str(tmp_path), clear=True, stdout=StringIO()
+    )
+    admin.refresh_from_db()
+    assert admin.check_password('secret-password'), (
+        'Убедитесь, что --clear не удаляет учётные записи персонала.'
+    )
+    assert Post.objects.filter(author=admin).exists(), (
+        'Убедитесь, что посты сохранённого администратора загружаются.'
+    )
+    assert not django_user_model.objects.get(
+        pk=author.pk
+    ).has_usable_password()
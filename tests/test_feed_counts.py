@@ -0,0 +1,65 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+pytestmark = [pytest.mark.django_db]
+
+
+def count_queries(client, url):
+    with CaptureQueriesContext(connection) as captured:
+        response = client.get(url)
+    assert response.status_code == 200
+    return response, [
+        q['sql'] for q in captured.captured_queries
+        if q['sql'].startswith('SELECT COUNT(*)')
+    ]
+
+
+def test_feed_count_is_cached_and_invalidated(
+        mixer, user, user_client, published_category,
+        many_posts_with_published_locations):
+    url = f'/category/{published_category.slug}/?page=1'
+    response, counts = count_queries(user_client, url)
+    assert counts
+    num_pages = response.context['paginator'].num_pages
+
+    _, counts = count_queries(user_client, url)
+    assert not counts, (
+        'Убедитесь, что количество постов в ленте берётся из кеша.'
+    )
+
+    mixer.cycle(11).blend(
+        'blog.Post', author=user, category=published_category
+    )
+    response, counts = count_queries(user_client, url)
+    assert counts and response.context['paginator'].num_pages > num_pages, (
+        'Убедитесь, что кеш количества постов сбрасывается '
+        'при записи постов.'
+    )
+
+
+def test_approximate_feed_count(
+        settings, user_client, many_posts_with_published_locations):
+    settings.FEED_COUNT_LIMIT = 10
+    response = user_client.get('/?page=2')
+    assert response.status_code == 200
+    paginator = response.context['paginator']
+    assert paginator.is_approximate and paginator.count == 10
+    assert len(response.context['page_obj']) == 10
+
+
+def test_paginator_renders_bounded_window(
+        user_client, many_posts_with_published_locations):
+    from blog.views import PostListView
+    PostListView.paginate_by, paginate_by = 1, PostListView.paginate_by
+    try:
+        response = user_client.get('/?page=10')
+    finally:
+        PostListView.paginate_by = paginate_by
+    window = list(response.context['page_obj'].page_window)
+    assert window == [1, '…', 8, 9, 10, 11, 12, '…', 20]
+    content = response.content.decode()
+    assert content.count('class="page-item') < 20, (
+        'Убедитесь, что пагинатор выводит ограниченное окно ссылок, '
+        'а не ссылку на каждую страницу.'
+    )
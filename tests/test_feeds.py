@@ -0,0 +1,84 @@
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_feeds_show_visible_posts(
+        mixer, user, unlogged_client, published_category,
+        post_with_published_location):
+    post = post_with_published_location
+    hidden = mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        title='Скрытый пост', is_published=False,
+    )
+    future = mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        title='Будущий пост', pub_date=timezone.now() + timedelta(days=1),
+    )
+    for url in (
+        '/feeds/rss/',
+        '/feeds/atom/',
+        f'/feeds/category/{post.category.slug}/rss/',
+        f'/feeds/category/{post.category.slug}/atom/',
+        f'/feeds/author/{post.author.username}/rss/',
+        f'/feeds/author/{post.author.username}/atom/',
+    ):
+        response = unlogged_client.get(url)
+        assert response.status_code == 200
+        content = response.content.decode()
+        assert post.get_absolute_url() in content, (
+            f'Убедитесь, что лента `{url}` содержит видимые посты.'
+        )
+        assert hidden.title not in content and future.title not in content, (
+            f'Убедитесь, что лента `{url}` не содержит скрытые посты.'
+        )
+    assert unlogged_client.get('/feeds/category/nope/rss/').status_code == 404
+
+
+def test_feed_cache_and_conditional_get(
+        unlogged_client, post_with_published_location):
+    post = post_with_published_location
+    first = unlogged_client.get('/feeds/rss/')
+    etag = first['ETag']
+    assert first.has_header('Last-Modified')
+
+    with CaptureQueriesContext(connection) as captured:
+        not_modified = unlogged_client.get(
+            '/feeds/rss/', HTTP_IF_NONE_MATCH=etag
+        )
+        cached = unlogged_client.get('/feeds/rss/')
+    assert not_modified.status_code == 304, (
+        'Убедитесь, что лента отвечает 304 на If-None-Match.'
+    )
+    assert cached.content == first.content
+    assert not captured.captured_queries, (
+        'Убедитесь, что неизменившаяся лента отдаётся без запросов к базе.'
+    )
+
+    post.title = 'Новый заголовок'
+    post.save()
+    changed = unlogged_client.get('/feeds/rss/', HTTP_IF_NONE_MATCH=etag)
+    assert changed.status_code == 200, (
+        'Убедитесь, что лента обновляется после изменения поста.'
+    )
+    assert 'Новый заголовок' in changed.content.decode()
+
+
+def test_feed_links_are_absolute_per_host(
+        settings, unlogged_client, post_with_published_location):
+    settings.ALLOWED_HOSTS = ['testserver', 'mirror.example']
+    author = post_with_published_location.author.username
+    atom = unlogged_client.get('/feeds/atom/').content.decode()
+    assert f'<uri>http://testserver/profile/{author}/</uri>' in atom, (
+        'Убедитесь, что ссылка на автора в ленте абсолютная.'
+    )
+    mirror = unlogged_client.get('/feeds/atom/', HTTP_HOST='mirror.example')
+    assert 'http://mirror.example/' in mirror.content.decode(), (
+        'Убедитесь, что кеш ленты учитывает хост запроса.'
+    )
+    assert 'http://testserver/' not in mirror.content.decode()
@@ -0,0 +1,60 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+pytestmark = [pytest.mark.django_db]
+
+
+def snapshot():
+    from blog.models import Comment, Post
+
+    return (
+        list(Post.objects.order_by('pk').values()),
+        list(Comment.objects.order_by('pk').values()),
+    )
+
+
+def test_generated_data_is_realistic():
+    from blog.models import Category, Comment, Post
+
+    call_command(
+        'generate_blog_data', posts=1000, seed=1, batch_size=300,
+        stdout=StringIO(),
+    )
+    assert Post.objects.count() == 1000
+    assert Post.objects.filter(pub_date__gt=timezone.now()).exists(), (
+        'Убедитесь, что среди постов есть отложенные.'
+    )
+    assert Post.objects.filter(is_published=False).exists()
+    for post in Post.objects.select_related('category')[:200]:
+        assert post.is_visible == bool(
+            post.is_published and post.category
+            and post.category.is_published
+        )
+        assert post.comment_count == post.comments.count()
+    counts = sorted(
+        Post.objects.values_list('comment_count', flat=True), reverse=True
+    )
+    assert sum(counts[:100]) > sum(counts) / 2, (
+        'Убедитесь, что комментарии распределены неравномерно.'
+    )
+    assert Category.objects.exists() and Comment.objects.exists()
+
+
+def test_same_seed_gives_same_data():
+    from blog.datafiles import MODELS
+
+    call_command(
+        'generate_blog_data', posts=200, seed=7, stdout=StringIO()
+    )
+    first = snapshot()
+    for model in reversed(MODELS):
+        model.objects.all().delete()
+    call_command(
+        'generate_blog_data', posts=200, seed=7, stdout=StringIO()
+    )
+    assert snapshot() == first, (
+        'Убедитесь, что одинаковый seed даёт одинаковые данные.'
+    )
@@ -0,0 +1,88 @@
+from io import BytesIO
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from PIL import Image
+
+pytestmark = [pytest.mark.django_db]
+
+
+def make_upload(width=1000, height=500):
+    buffer = BytesIO()
+    Image.new('RGB', (width, height), 'teal').save(buffer, format='JPEG')
+    return SimpleUploadedFile(
+        'photo.jpg', buffer.getvalue(), content_type='image/jpeg'
+    )
+
+
+def test_variants_generated_after_upload(
+        settings, tmp_path, user_client, published_category,
+        django_capture_on_commit_callbacks):
+    from blog.models import Post
+
+    settings.MEDIA_ROOT = tmp_path
+    settings.IMAGE_WORKERS = 0
+    with django_capture_on_commit_callbacks(execute=True):
+        user_client.post('/posts/create/', {
+            'title': 'С картинкой',
+            'text': 'Текст',
+            'pub_date': '2020-01-01T00:00',
+            'category': published_category.pk,
+            'image': make_upload(),
+        })
+    post = Post.objects.get(title='С картинкой')
+    assert post.image_variants['source'] == post.image.name
+    assert post.image_variants['webp'] == [320, 640, 1000], (
+        'Убедитесь, что копии картинки не шире оригинала.'
+    )
+    for image_format, extension in (('webp', 'webp'), ('jpeg', 'jpg')):
+        for width in post.image_variants[image_format]:
+            path = tmp_path / post.image.name.replace(
+                '.jpg', f'.{width}w.{extension}'
+            )
+            with Image.open(path) as variant:
+                assert variant.width == width
+                assert variant.format == image_format.upper()
+
+    content = user_client.get('/').content.decode()
+    assert 'type="image/webp"' in content and '640w' in content, (
+        'Убедитесь, что лента использует srcset из готовых копий.'
+    )
+    detail = user_client.get(f'/posts/{post.id}/').content.decode()
+    assert 'srcset=' in detail
+
+
+def test_original_used_until_variants_exist(
+        settings, tmp_path, user_client, published_category):
+    from blog.models import Post
+
+    settings.MEDIA_ROOT = tmp_path
+    # Без выполнения on_commit копии ещё не созданы
+    user_client.post('/posts/create/', {
+        'title': 'Без копий',
+        'text': 'Текст',
+        'pub_date': '2020-01-01T00:00',
+        'category': published_category.pk,
+        'image': make_upload(),
+    })
+    post = Post.objects.get(title='Без копий')
+    content = user_client.get(f'/posts/{post.id}/').content.decode()
+    assert post.image.url in content
+    assert 'srcset=' not in content, (
+        'Убедитесь, что до появления копий выводится только оригинал.'
+    )
+
+
+def test_render_variants_in_process_pool(tmp_path):
+    from concurrent.futures import ProcessPoolExecutor
+
+    from blog.image_worker import render_variants
+
+    source = tmp_path / 'source.png'
+    Image.new('RGBA', (400, 200)).save(source)
+    with ProcessPoolExecutor(max_workers=1) as executor:
+        variants = executor.submit(
+            render_variants, str(source), (100, 800), ('jpeg',), 80
+        ).result()
+    assert variants == {'jpeg': [100, 400]}
+    assert (tmp_path / 'source.100w.jpg').exists()
@@ -0,0 +1,203 @@
+import gzip
+import json
+from io import StringIO
+from pathlib import Path
+
+import pytest
+from django.core.management import call_command
+
+pytestmark = [pytest.mark.django_db]
+
+FIXTURE = Path(__file__).resolve().parents[1] / 'db.json'
+
+
+def test_iter_records_streams_array(monkeypatch):
+    from blog import datafiles
+
+    # Маленькие блоки: объекты и числа разрезаются на границах чтения
+    monkeypatch.setattr(datafiles, 'READ_SIZE', 5)
+    with open(FIXTURE, encoding='utf-8') as file:
+        expected = json.load(file)
+    assert list(datafiles.iter_records(FIXTURE)) == expected
+
+
+def test_iter_records_rejects_truncated_file(tmp_path):
+    from blog.datafiles import iter_records
+
+    path = tmp_path / 'broken.json'
+    path.write_text('[{"model": "blog.category", "pk": 1', encoding='utf-8')
+    with pytest.raises(ValueError):
+        list(iter_records(path))
+
+
+def test_iter_records_stops_at_malformed_element(monkeypatch):
+    from io import StringIO as TextIO
+
+    from blog import datafiles
+
+    monkeypatch.setattr(datafiles, 'READ_SIZE', 16)
+    item = '{"model": "blog.category", "pk": 1}'
+    file = TextIO(
+        f'[{item}, {{"model": oops}}, ' + ', '.join([item] * 1000) + ']'
+    )
+    records = datafiles._iter_array(file)
+    assert next(records)['pk'] == 1
+    with pytest.raises(ValueError, match='Испорченный'):
+        next(records)
+    assert file.tell() < 200, (
+        'Убедитесь, что испорченный элемент не заставляет дочитывать '
+        'файл в память.'
+    )
+
+
+def test_import_fixture(django_assert_max_num_queries):
+    from blog.models import Category, Post
+
+    with django_assert_max_num_queries(50):
+        call_command(
+            'import_blog_data', str(FIXTURE), batch_size=10, stdout=StringIO()
+        )
+    assert Post.objects.count() == 39
+    post = Post.objects.get(pk=1)
+    assert post.created_at.isoformat() == '2022-12-18T23:06:18.993000+00:00', (
+        'Убедитесь, что даты создания переносятся из файла.'
+    )
+    assert post.updated_at == post.created_at
+    assert (post.author_id, post.category_id, post.location_id) == (3, 4, 5)
+    assert post.is_visible == (
+        post.is_published and Category.objects.get(pk=4).is_published
+    ), 'Убедитесь, что флаг видимости поста вычисляется при загрузке.'
+
+
+def test_import_jsonl_with_comments_and_dangling_keys(tmp_path, user):
+    from blog.models import Post
+
+    records = [
+        {'model': 'blog.category', 'pk': 1, 'fields': {
+            'title': 'Скрытая', 'slug': 'hidden', 'description': '',
+            'is_published': False,
+            'created_at': '2020-01-01T00:00:00Z',
+        }},
+        {'model': 'blog.post', 'pk': 1, 'fields': {
+            'title': 'Пост', 'text': 'Текст',
+            'pub_date': '2020-01-01T00:00:00Z', 'is_published': True,
+            'created_at': '2020-01-01T00:00:00Z',
+            'author': user.pk, 'category': 1, 'location': 42,
+        }},
+        {'model': 'blog.post', 'pk': 2, 'fields': {
+            'title': 'Без автора', 'text': 'Текст',
+            'pub_date': '2020-01-01T00:00:00Z',
+            'created_at': '2020-01-01T00:00:00Z', 'author': 999,
+        }},
+        {'model': 'blog.comment', 'pk': 1, 'fields': {
+            'text': 'Комментарий', 'post': 1, 'author': user.pk,
+            'created_at': '2020-01-02T00:00:00Z',
+        }},
+    ]
+    path = tmp_path / 'data.jsonl.gz'
+    with gzip.open(path, 'wt', encoding='utf-8') as file:
+        for record in records:
+            file.write(json.dumps(record) + '\n')
+    out = StringIO()
+    call_command('import_blog_data', str(path), stdout=out)
+    post = Post.objects.get()
+    assert post.location_id is None, (
+        'Убедитесь, что ссылка на отсутствующий объект обнуляется.'
+    )
+    assert post.comment_count == 1
+    assert post.is_visible is False
+    assert 'blog.post: прочитано 2, пропущено 1' in out.getvalue()
+
+
+def test_clear_is_atomic(monkeypatch, tmp_path, post_with_published_location):
+    from django.db import DatabaseError, connection
+
+    from blog.models import Post
+
+    flush = connection.ops.sql_flush
+    monkeypatch.setattr(
+        connection.ops, 'sql_flush',
+        lambda *args, **kwargs: [*flush(*args, **kwargs), 'SELECT broken'],
+    )
+    with pytest.raises(DatabaseError):
+        call_command(
+            'import_blog_data', str(tmp_path), clear=True, stdout=StringIO()
+        )
+    assert Post.objects.filter(pk=post_with_published_location.pk).exists(), (
+        'Убедитесь, что при ошибке очистка откатывается целиком.'
+    )
+
+
+def test_clear_keeps_images_and_resets_cards(
+        tmp_path, post_with_published_location):
+    from blog.caching import attach_card_versions
+    from blog.models import Post
+
+    post = post_with_published_location
+    path = Path(post.image.path)
+    version = attach_card_versions([post])[0].card_version
+    call_command(
+        'import_blog_data', str(tmp_path), clear=True, stdout=StringIO()
+    )
+    assert not Post.objects.exists()
+    assert path.exists(), (
+        'Убедитесь, что очистка перед загрузкой не удаляет картинки.'
+    )
+    assert attach_card_versions([post])[0].card_version != version, (
+        'Убедитесь, что очистка сбрасывает кеш карточек удалённых постов.'
+    )
+
+
+def test_import_does_not_attach_to_conflicting_rows(tmp_path, user, mixer):
+    from blog.models import Post
+
+    other = mixer.blend('auth.User')
+    records = [
+        # id занят другим пользователем, а имя — третьим
+        {'model': 'auth.user', 'pk': other.pk, 'fields': {
+            'username': 'author-from-file', 'password': '',
+        }},
+        {'model': 'auth.user', 'pk': other.pk + 100, 'fields': {
+            'username': user.username, 'password': '',
+        }},
+        {'model': 'blog.post', 'pk': 1, 'fields': {
+            'title': 'Чужой id', 'text': 'Текст',
+            'pub_date': '2020-01-01T00:00:00Z', 'author': other.pk,
+        }},
+        {'model': 'blog.post', 'pk': 2, 'fields': {
+            'title': 'Чужое имя', 'text': 'Текст',
+            'pub_date': '2020-01-01T00:00:00Z', 'author': other.pk + 100,
+        }},
+        {'model': 'blog.post', 'pk': 3, 'fields': {
+            'title': 'Прежний автор', 'text': 'Текст',
+            'pub_date': '2020-01-01T00:00:00Z', 'author': user.pk,
+        }},
+    ]
+    path = tmp_path / 'data.jsonl'
+    path.write_text(
+        ''.join(json.dumps(record) + '\n' for record in records),
+        encoding='utf-8',
+    )
+    out = StringIO()
+    call_command('import_blog_data', str(path), stdout=out)
+    assert list(Post.objects.values_list('title', 'author')) == [
+        ('Прежний автор', user.pk)
+    ], (
+        'Убедитесь, что посты не привязываются к существующим строкам, '
+        'чьи id или имена заняли строки файла.'
+    )
+    assert 'auth.user: прочитано 2, пропущено 2' in out.getvalue()
+
+
+def test_import_warns_about_local_cache(settings, tmp_path):
+    settings.CACHES = {'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }}
+    stderr = StringIO()
+    call_command(
+        'import_blog_data', str(tmp_path), stdout=StringIO(), stderr=stderr
+    )
+    assert 'LocMemCache' in stderr.getvalue(), (
+        'Убедитесь, что команда предупреждает, если сброс кеша не дойдёт '
+        'до веб-процессов.'
+    )
@@ -0,0 +1,105 @@
+import pytest
+
+from conftest import N_PER_PAGE
+
+pytestmark = [pytest.mark.django_db]
+
+
+def collect_pages(client, url):
+    pages = []
+    cursor = None
+    while True:
+        response = client.get(url, {'cursor': cursor} if cursor else {})
+        assert response.status_code == 200
+        page_obj = response.context['page_obj']
+        pages.append(page_obj)
+        cursor = page_obj.next_cursor
+        if cursor is None:
+            return pages
+
+
+def test_keyset_walks_whole_feed(
+        user_client, user, published_category,
+        many_posts_with_published_locations):
+    from blog.utils import get_filter_posts
+
+    expected = list(
+        get_filter_posts().order_by('-pub_date', '-id')
+        .values_list('id', flat=True)
+    )
+    assert len(expected) > N_PER_PAGE
+    for url in (
+        '/',
+        f'/category/{published_category.slug}/',
+        f'/profile/{user.username}/',
+    ):
+        pages = collect_pages(user_client, url)
+        walked = [post.id for page in pages for post in page]
+        assert walked == expected, (
+            'Убедитесь, что курсорная пагинация по адресу '
+            f'`{url}` выдаёт каждую публикацию ровно один раз, '
+            '«от новых к старым».'
+        )
+        assert all(len(page) <= N_PER_PAGE for page in pages)
+
+
+def test_keyset_previous_cursor_returns_same_page(
+        user_client, many_posts_with_published_locations):
+    first = user_client.get('/').context['page_obj']
+    second = user_client.get(
+        '/', {'cursor': first.next_cursor}
+    ).context['page_obj']
+    back = user_client.get(
+        '/', {'cursor': second.previous_cursor}
+    ).context['page_obj']
+    assert [post.id for post in back] == [post.id for post in first], (
+        'Убедитесь, что ссылка на предыдущую страницу курсорной пагинации '
+        'возвращает ту же страницу.'
+    )
+
+
+def test_keyset_invalid_cursor_and_legacy_pages(
+        user_client, many_posts_with_published_locations):
+    first = user_client.get('/').context['page_obj']
+    broken = user_client.get('/', {'cursor': 'not-a-cursor'})
+    assert broken.status_code == 200
+    assert [p.id for p in broken.context['page_obj']] == [
+        p.id for p in first
+    ]
+
+    legacy = user_client.get('/', {'page': 2})
+    assert legacy.status_code == 200, (
+        'Убедитесь, что старые ссылки вида `?page=N` продолжают работать.'
+    )
+    assert legacy.context['page_obj'].number == 2
+
+
+def test_keyset_cursor_keeps_microseconds(mixer, user, published_category):
+    from datetime import datetime, timezone
+
+    from blog.paginators import KeysetPaginator
+    from blog.utils import get_filter_posts
+
+    # Даты различаются на микросекунды внутри одной миллисекунды
+    moment = datetime(2020, 1, 1, 12, 0, 0, 500000, tzinfo=timezone.utc)
+    for offset in range(7):
+        mixer.blend(
+            'blog.Post', author=user, category=published_category,
+            is_published=True,
+            pub_date=moment.replace(microsecond=moment.microsecond + offset),
+        )
+    expected = list(get_filter_posts().values_list('id', flat=True))
+    paginator = KeysetPaginator(
+        get_filter_posts(), 2, keys=('pub_date', 'id')
+    )
+    walked, cursor = [], None
+    while True:
+        page = paginator.get_page(cursor)
+        walked.extend(post.id for post in page)
+        cursor = page.next_cursor
+        if cursor is None:
+            break
+    assert walked == expected, (
+        'Убедитесь, что курсор хранит время публикации с микросекундами '
+        'и страницы не повторяют и не пропускают посты.'
+    )
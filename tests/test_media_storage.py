@@ -0,0 +1,176 @@
+import hashlib
+from io import BytesIO
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from PIL import Image
+
+pytestmark = [pytest.mark.django_db]
+
+
+def make_image(color='teal'):
+    buffer = BytesIO()
+    Image.new('RGB', (400, 200), color).save(buffer, format='JPEG')
+    return buffer.getvalue()
+
+
+def create_post(client, category, title, content):
+    from blog.models import Post
+
+    client.post('/posts/create/', {
+        'title': title,
+        'text': 'Текст',
+        'pub_date': '2020-01-01T00:00',
+        'category': category.pk,
+        'image': SimpleUploadedFile(
+            'photo.JPG', content, content_type='image/jpeg'
+        ),
+    })
+    return Post.objects.get(title=title)
+
+
+def test_upload_stored_by_content_hash(
+        settings, tmp_path, user_client, published_category):
+    settings.MEDIA_ROOT = tmp_path
+    content = make_image()
+    digest = hashlib.sha256(content).hexdigest()
+    post = create_post(user_client, published_category, 'Пост', content)
+    assert post.image.name == (
+        f'posts/{digest[:2]}/{digest[2:4]}/{digest}.jpg'
+    ), 'Убедитесь, что картинка хранится в каталоге по хешу содержимого.'
+    assert (tmp_path / post.image.name).read_bytes() == content
+    assert not list(tmp_path.glob('*.upload')), (
+        'Убедитесь, что временный файл загрузки не остаётся на диске.'
+    )
+
+
+def test_identical_uploads_deduplicated(
+        settings, tmp_path, user_client, published_category):
+    settings.MEDIA_ROOT = tmp_path
+    content = make_image()
+    first = create_post(user_client, published_category, 'Первый', content)
+    second = create_post(user_client, published_category, 'Второй', content)
+    assert first.image.name == second.image.name, (
+        'Убедитесь, что одинаковые картинки хранятся одним файлом.'
+    )
+    assert len([
+        path for path in tmp_path.rglob('*') if path.is_file()
+    ]) == 1
+
+
+def test_unused_file_deleted_with_last_post(
+        settings, tmp_path, user_client, published_category,
+        django_capture_on_commit_callbacks):
+    settings.MEDIA_ROOT = tmp_path
+    settings.IMAGE_WORKERS = 0
+    content = make_image()
+    with django_capture_on_commit_callbacks(execute=True):
+        first = create_post(user_client, published_category, 'Первый', content)
+        second = create_post(
+            user_client, published_category, 'Второй', content
+        )
+    first.refresh_from_db()
+    second.refresh_from_db()
+    assert second.image_variants == first.image_variants, (
+        'Убедитесь, что копии одинаковой картинки не создаются повторно.'
+    )
+    files = [path for path in tmp_path.rglob('*') if path.is_file()]
+    assert len(files) > 1
+
+    with django_capture_on_commit_callbacks(execute=True):
+        first.delete()
+    assert all(path.exists() for path in files), (
+        'Убедитесь, что файл, на который ссылается другой пост, '
+        'не удаляется.'
+    )
+    with django_capture_on_commit_callbacks(execute=True):
+        second.delete()
+    assert not any(path.exists() for path in files), (
+        'Убедитесь, что файл и его копии удаляются вместе с последним '
+        'постом, который на них ссылается.'
+    )
+
+
+def test_replaced_image_released(
+        settings, tmp_path, user_client, published_category,
+        django_capture_on_commit_callbacks):
+    settings.MEDIA_ROOT = tmp_path
+    post = create_post(user_client, published_category, 'Пост', make_image())
+    old_path = tmp_path / post.image.name
+    with django_capture_on_commit_callbacks(execute=True):
+        user_client.post(f'/posts/{post.id}/edit/', {
+            'title': 'Пост',
+            'text': 'Текст',
+            'pub_date': '2020-01-01T00:00',
+            'category': published_category.pk,
+            'image': SimpleUploadedFile(
+                'other.jpg', make_image('olive'), content_type='image/jpeg'
+            ),
+        })
+    post.refresh_from_db()
+    assert (tmp_path / post.image.name).exists()
+    assert not old_path.exists(), (
+        'Убедитесь, что заменённая картинка удаляется, если на неё '
+        'больше никто не ссылается.'
+    )
+
+
+def test_image_column_indexed():
+    from django.db import connection
+
+    from blog.models import Post
+
+    with connection.cursor() as cursor:
+        constraints = connection.introspection.get_constraints(
+            cursor, Post._meta.db_table
+        )
+    assert any(
+        constraint['index'] and constraint['columns'] == ['image']
+        for constraint in constraints.values()
+    ), 'Убедитесь, что поиск постов по файлу картинки идёт по индексу.'
+
+
+def test_references_counted_per_post(
+        settings, tmp_path, user_client, published_category,
+        django_capture_on_commit_callbacks):
+    from blog.models import StoredImage
+
+    settings.MEDIA_ROOT = tmp_path
+    content = make_image()
+    with django_capture_on_commit_callbacks(execute=True):
+        first = create_post(user_client, published_category, 'Первый', content)
+        create_post(user_client, published_category, 'Второй', content)
+    counter = StoredImage.objects.get(name=first.image.name)
+    assert counter.references == 2, (
+        'Убедитесь, что каждая загрузка учитывается в счётчике ссылок.'
+    )
+    with django_capture_on_commit_callbacks(execute=True):
+        first.delete()
+    counter.refresh_from_db()
+    assert counter.references == 1
+
+
+def test_upload_during_release_keeps_file(
+        settings, tmp_path, user_client, published_category,
+        django_capture_on_commit_callbacks):
+    from django.core.files.base import ContentFile
+
+    from blog.models import Post
+
+    settings.MEDIA_ROOT = tmp_path
+    content = make_image()
+    post = create_post(user_client, published_category, 'Пост', content)
+    path = tmp_path / post.image.name
+    with django_capture_on_commit_callbacks() as callbacks:
+        post.delete()
+    # Тот же файл загружают до того, как удаление закончило уборку
+    storage = Post._meta.get_field('image').storage
+    assert storage.save('posts/again.jpg', ContentFile(content)) == (
+        post.image.name
+    )
+    for callback in callbacks:
+        callback()
+    assert path.exists(), (
+        'Убедитесь, что файл не удаляется, пока на него ссылается '
+        'незавершённая загрузка.'
+    )
@@ -0,0 +1,47 @@
+import pytest
+from django.test import Client
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_anonymous_pages_are_cached_and_purged(
+        unlogged_client, user_client, post_with_published_location):
+    post = post_with_published_location
+    Post = type(post)
+    url = f'/posts/{post.id}/'
+    assert post.title in unlogged_client.get(url).content.decode()
+
+    Post.objects.filter(pk=post.pk).update(title='Обход сигналов')
+    assert 'Обход сигналов' not in unlogged_client.get(url).content.decode(), (
+        'Убедитесь, что страницы для анонимных посетителей '
+        'отдаются из кеша.'
+    )
+    assert 'Обход сигналов' in user_client.get(url).content.decode(), (
+        'Убедитесь, что авторизованным пользователям страницы '
+        'из кеша не отдаются.'
+    )
+
+    post.refresh_from_db()
+    post.text = 'Новый текст'
+    post.save()
+    assert 'Новый текст' in unlogged_client.get(url).content.decode(), (
+        'Убедитесь, что сохранение поста сбрасывает кеш страниц.'
+    )
+
+    user_client.post(f'/posts/{post.id}/comment/', {'text': 'Свежий отзыв'})
+    assert 'Свежий отзыв' in unlogged_client.get(url).content.decode(), (
+        'Убедитесь, что новый комментарий сбрасывает кеш страниц.'
+    )
+
+
+def test_login_keeps_page_cache(
+        unlogged_client, user, post_with_published_location):
+    post = post_with_published_location
+    url = f'/posts/{post.id}/'
+    unlogged_client.get(url)
+    type(post).objects.filter(pk=post.pk).update(title='Обход сигналов')
+
+    Client().force_login(user)
+    assert 'Обход сигналов' not in unlogged_client.get(url).content.decode(), (
+        'Убедитесь, что вход пользователя не сбрасывает кеш страниц.'
+    )
@@ -0,0 +1,45 @@
+import pytest
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_post_card_fragment_cache(user_client, post_with_published_location):
+    post = post_with_published_location
+    Post = type(post)
+    assert post.title in user_client.get('/').content.decode()
+
+    Post.objects.filter(pk=post.pk).update(title='Обход сигналов')
+    assert 'Обход сигналов' not in user_client.get('/').content.decode(), (
+        'Убедитесь, что карточки постов в ленте берутся из кеша.'
+    )
+
+    post.title = 'Новый заголовок'
+    post.save()
+    assert 'Новый заголовок' in user_client.get('/').content.decode(), (
+        'Убедитесь, что изменение поста сбрасывает кеш его карточки.'
+    )
+
+    category = post.category
+    category.title = 'Новая категория'
+    category.save()
+    assert 'Новая категория' in user_client.get('/').content.decode(), (
+        'Убедитесь, что изменение категории сбрасывает кеш карточек.'
+    )
+
+    user_client.post(f'/posts/{post.id}/comment/', {'text': 'Комментарий'})
+    assert 'Комментарии (1)' in user_client.get('/').content.decode()
+
+
+def test_login_keeps_author_cards(user_client, post_with_published_location):
+    from blog.caching import get_version
+    from django.contrib.auth.models import update_last_login
+
+    author = post_with_published_location.author
+    version = get_version(f'user:{author.pk}')
+    update_last_login(None, author)
+    assert get_version(f'user:{author.pk}') == version, (
+        'Убедитесь, что вход автора не сбрасывает кеш его карточек.'
+    )
+    author.first_name = 'Новое имя'
+    author.save(update_fields=['first_name'])
+    assert get_version(f'user:{author.pk}') != version
@@ -0,0 +1,66 @@
+import logging
+
+import pytest
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_query_budget_raises_logs_and_samples(
+        settings, caplog, user_client, post_with_published_location):
+    from blog.middleware import QueryBudgetExceeded
+
+    settings.QUERY_BUDGET_SAMPLE_RATE = 1.0
+    settings.QUERY_BUDGETS = {'blog:index': 1}
+    settings.QUERY_BUDGET_RAISE = True
+    with pytest.raises(QueryBudgetExceeded):
+        user_client.get('/')
+
+    settings.QUERY_BUDGET_RAISE = False
+    with caplog.at_level(logging.WARNING, logger='blog.middleware'):
+        assert user_client.get('/').status_code == 200
+    assert 'blog:index' in caplog.text, (
+        'Убедитесь, что превышение бюджета запросов попадает в лог.'
+    )
+
+    caplog.clear()
+    settings.QUERY_BUDGET_SAMPLE_RATE = 0
+    with caplog.at_level(logging.WARNING, logger='blog.middleware'):
+        user_client.get('/')
+    assert not caplog.records
+
+
+def test_query_time_budget_only_logs(
+        settings, caplog, user_client, post_with_published_location):
+    settings.QUERY_BUDGET_SAMPLE_RATE = 1.0
+    settings.QUERY_BUDGET_RAISE = True
+    settings.QUERY_TIME_BUDGET = 0
+    with caplog.at_level(logging.WARNING, logger='blog.middleware'):
+        assert user_client.get('/').status_code == 200, (
+            'Убедитесь, что превышение времени SQL не прерывает запрос.'
+        )
+    assert 'blog:index' in caplog.text
+
+
+def test_edit_views_load_object_once(
+        user_client, mixer, user, post_with_published_location):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    post = post_with_published_location
+    comment = mixer.blend('blog.Comment', post=post, author=user)
+    for url, table in (
+        (f'/posts/{post.id}/edit/', 'blog_post'),
+        (f'/posts/{post.id}/delete/', 'blog_post'),
+        (f'/posts/{post.id}/edit_comment/{comment.id}/', 'blog_comment'),
+        (f'/posts/{post.id}/delete_comment/{comment.id}/', 'blog_comment'),
+    ):
+        with CaptureQueriesContext(connection) as captured:
+            assert user_client.get(url).status_code == 200
+        lookups = [
+            q['sql'] for q in captured.captured_queries
+            if q['sql'].startswith('SELECT') and f'FROM "{table}"' in q['sql']
+        ]
+        assert len(lookups) == 1, (
+            f'Убедитесь, что страница `{url}` загружает объект '
+            'одним запросом.'
+        )
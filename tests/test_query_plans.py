@@ -0,0 +1,88 @@
+import re
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+pytestmark = [pytest.mark.django_db]
+
+SCAN_RE = re.compile(r'^SCAN (?:TABLE )?(\w+)', re.I)
+SORT_RE = re.compile(r'^USE TEMP B-TREE FOR (?:RIGHT PART OF )?ORDER BY', re.I)
+
+
+def get_scanned_table(detail):
+    """Таблица, которую строка плана читает целиком, без индекса"""
+    match = SCAN_RE.match(detail)
+    if match and ' USING ' not in detail.upper():
+        return match.group(1)
+    return None
+
+
+def find_full_scans(queries):
+    """
+    Возвращает планы SELECT-запросов к таблицам блога, которые
+    читают таблицу целиком или сортируют выборку без индекса.
+    """
+    scans = []
+    with connection.cursor() as cursor:
+        for query in queries:
+            sql = query['sql']
+            if not sql.lstrip().upper().startswith('SELECT'):
+                continue
+            cursor.execute('EXPLAIN QUERY PLAN ' + sql)
+            for row in cursor.fetchall():
+                detail = row[-1].strip()
+                table = get_scanned_table(detail)
+                if (
+                    table and table.startswith('blog_')
+                    or SORT_RE.match(detail) and '"blog_' in sql
+                ):
+                    scans.append(f'{detail}\n    {sql}')
+    return scans
+
+
+@pytest.mark.parametrize('detail, table', (
+    ('SCAN blog_post', 'blog_post'),
+    ('SCAN TABLE blog_post', 'blog_post'),
+    ('SCAN blog_post USING INDEX post_feed_idx', None),
+    ('SCAN TABLE blog_post USING COVERING INDEX post_feed_idx', None),
+    ('SEARCH blog_post USING INTEGER PRIMARY KEY (rowid=?)', None),
+))
+def test_full_scan_pattern(detail, table):
+    assert get_scanned_table(detail) == table, (
+        'Убедитесь, что проход по индексу не считается полным чтением '
+        'таблицы.'
+    )
+
+
+@pytest.mark.skipif(
+    connection.vendor != 'sqlite', reason='EXPLAIN QUERY PLAN есть в SQLite'
+)
+def test_views_use_indexes(
+        user, user_client, unlogged_client, published_category,
+        many_posts_with_published_locations, comment_to_a_post):
+    post = comment_to_a_post.post
+    urls = (
+        '/',
+        '/?page=2',
+        f'/posts/{post.id}/',
+        f'/category/{published_category.slug}/',
+        f'/category/{published_category.slug}/?page=2',
+        f'/profile/{user.username}/',
+        f'/profile/{user.username}/?page=2',
+    )
+    for client in (user_client, unlogged_client):
+        for url in urls:
+            first_page = client.get(url)
+            cursor = getattr(
+                first_page.context.get('page_obj'), 'next_cursor', None
+            )
+            with CaptureQueriesContext(connection) as captured:
+                client.get(url)
+                if cursor:
+                    client.get(url, {'cursor': cursor})
+            scans = find_full_scans(captured.captured_queries)
+            assert not scans, (
+                f'Запросы страницы `{url}` читают таблицу целиком:\n'
+                + '\n'.join(scans)
+            )
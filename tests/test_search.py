@@ -0,0 +1,114 @@
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from test_query_plans import find_full_scans
+
+pytestmark = [
+    pytest.mark.django_db,
+    pytest.mark.skipif(
+        connection.vendor != 'sqlite', reason='Индекс FTS5 есть в SQLite'
+    ),
+]
+
+
+@pytest.fixture
+def blend_post(mixer, user, published_category):
+    def blend(title, text, **kwargs):
+        kwargs.setdefault('pub_date', timezone.now() - timedelta(days=1))
+        return mixer.blend(
+            'blog.Post', author=user, category=published_category,
+            title=title, text=text, **kwargs
+        )
+    return blend
+
+
+def search(client, query, **params):
+    response = client.get('/search/', {'q': query, **params})
+    assert response.status_code == 200
+    return response
+
+
+def test_search_ranks_and_highlights(unlogged_client, blend_post):
+    in_text = blend_post('Прогулка', 'Видели <b>ежика</b> в лесу')
+    in_title = blend_post('Ежики', 'Про животных')
+    blend_post('Котики', 'Совсем другое')
+
+    response = search(unlogged_client, 'ежик')
+    posts = list(response.context['page_obj'])
+    assert [post.id for post in posts] == [in_title.id, in_text.id], (
+        'Убедитесь, что поиск находит посты по началу слова без учёта '
+        'регистра, а совпадение в заголовке ставит выше.'
+    )
+    content = response.content.decode()
+    assert '<mark>ежика</mark>' in content, (
+        'Убедитесь, что совпадения во фрагменте текста выделяются.'
+    )
+    assert '&lt;b&gt;' in content and '<b>ежика' not in content, (
+        'Убедитесь, что фрагмент текста экранируется.'
+    )
+
+
+def test_search_follows_changes_and_visibility(
+        unlogged_client, blend_post):
+    post = blend_post('Заметка', 'старое слово')
+    blend_post('Скрытая заметка', 'старое', is_published=False)
+    blend_post(
+        'Будущая заметка', 'старое',
+        pub_date=timezone.now() + timedelta(days=1),
+    )
+    found = search(unlogged_client, 'старое').context['page_obj']
+    assert [p.id for p in found] == [post.id], (
+        'Убедитесь, что поиск не показывает скрытые и отложенные посты.'
+    )
+
+    post.text = 'новое слово'
+    post.save()
+    assert not search(unlogged_client, 'старое').context['page_obj']
+    assert len(search(unlogged_client, 'новое').context['page_obj']) == 1, (
+        'Убедитесь, что поисковый индекс обновляется при правке поста.'
+    )
+
+    post.delete()
+    assert not search(unlogged_client, 'новое').context['page_obj']
+    assert not search(unlogged_client, '"').context['page_obj']
+
+
+def test_search_keyset_pagination(unlogged_client, blend_post):
+    from conftest import N_PER_PAGE
+
+    expected = {
+        blend_post(f'Пост {index}', 'общее слово ' * (index + 1)).id
+        for index in range(N_PER_PAGE * 2 + 3)
+    }
+    walked = []
+    cursor = None
+    while True:
+        params = {'cursor': cursor} if cursor else {}
+        with CaptureQueriesContext(connection) as captured:
+            page = search(unlogged_client, 'общее', **params).context[
+                'page_obj'
+            ]
+        scans = find_full_scans(captured.captured_queries)
+        assert not any('SCAN blog_post ' in scan for scan in scans), (
+            'Убедитесь, что поиск не читает таблицу постов целиком.'
+        )
+        walked.extend(post.id for post in page)
+        cursor = page.next_cursor
+        if cursor is None:
+            break
+    assert len(walked) == len(expected) and set(walked) == expected, (
+        'Убедитесь, что курсорная пагинация поиска выдаёт каждый '
+        'найденный пост ровно один раз.'
+    )
+
+
+def test_admin_search_uses_index(admin_client, blend_post):
+    post = blend_post('Уникальный заголовок', 'текст')
+    blend_post('Другой', 'текст')
+    response = admin_client.get('/admin/blog/post/', {'q': 'уникальный'})
+    assert response.status_code == 200
+    assert [p.id for p in response.context['cl'].result_list] == [post.id]
@@ -0,0 +1,130 @@
+import os
+import subprocess
+import sys
+from datetime import timedelta
+from pathlib import Path
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def sitemap_settings(settings, tmp_path):
+    settings.SITEMAP_ROOT = tmp_path
+    settings.SITEMAP_SHARD_SIZE = 2
+    settings.SITEMAP_CHUNK_SIZE = 1
+    return settings
+
+
+def read(client, url):
+    response = client.get(url)
+    assert response.status_code == 200
+    return b''.join(response.streaming_content).decode()
+
+
+def test_sitemap_lists_visible_objects(
+        sitemap_settings, mixer, user, unlogged_client, published_category,
+        many_posts_with_published_locations):
+    hidden = mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        pub_date=timezone.now() + timedelta(days=1),
+    )
+    assert unlogged_client.get('/sitemap.xml').status_code == 404, (
+        'Убедитесь, что запрос к карте сайта не перестраивает её.'
+    )
+    call_command('build_sitemaps')
+    index = read(unlogged_client, '/sitemap.xml')
+    shards = [
+        line.split('<loc>')[1].split('</loc>')[0].split('8000')[1]
+        for line in index.splitlines() if '<loc>' in line
+    ]
+    content = ''.join(read(unlogged_client, url) for url in shards)
+    for post in many_posts_with_published_locations:
+        assert post.get_absolute_url() in content, (
+            'Убедитесь, что карта сайта содержит все видимые посты.'
+        )
+    assert f'/posts/{hidden.id}/<' not in content, (
+        'Убедитесь, что карта сайта не содержит скрытые посты.'
+    )
+    assert f'/category/{published_category.slug}/' in content
+    assert f'/profile/{user.username}/' in content
+    assert len([url for url in shards if '/posts-' in url]) > 1, (
+        'Убедитесь, что посты разбиты на шарды по диапазонам id.'
+    )
+
+
+def test_sitemap_rebuilds_only_changed_shards(
+        sitemap_settings, mixer, user, published_category,
+        many_posts_with_published_locations):
+    from blog.sitemaps import get_shard, refresh_sitemaps
+
+    refresh_sitemaps()
+    assert refresh_sitemaps() == [], (
+        'Убедитесь, что без изменений шарды не перестраиваются.'
+    )
+
+    post = many_posts_with_published_locations[0]
+    post.title = 'Новый заголовок'
+    post.save()
+    assert refresh_sitemaps() == [f'posts-{get_shard(post.id)}.xml'], (
+        'Убедитесь, что перестраивается только шард изменённого поста.'
+    )
+
+    user.username = 'renamed'
+    user.save()
+    assert refresh_sitemaps() == [f'profiles-{get_shard(user.id)}.xml']
+
+    call_command('build_sitemaps', force=True)
+    assert (sitemap_settings.SITEMAP_ROOT / 'sitemap.xml').exists()
+
+
+def test_sitemap_refresh_skips_when_locked(sitemap_settings):
+    from django.core.files import locks
+
+    from blog.sitemaps import LOCK, refresh_sitemaps
+
+    root = sitemap_settings.SITEMAP_ROOT
+    with open(root / LOCK, 'w') as lock:
+        locks.lock(lock, locks.LOCK_EX)
+        assert refresh_sitemaps() is None, (
+            'Убедитесь, что карту сайта не перестраивают два процесса сразу.'
+        )
+    assert refresh_sitemaps() is not None
+    assert not list(root.glob('*.tmp'))
+
+
+def test_build_sitemaps_is_stable_across_processes(tmp_path):
+    # Каждая команда — отдельный процесс со своим пустым кешем
+    (tmp_path / 'sitemap_settings.py').write_text(
+        'from blogicum.settings import *  # noqa\n'
+        'DATABASES = {"default": {\n'
+        '    "ENGINE": "django.db.backends.sqlite3",\n'
+        f'    "NAME": {str(tmp_path / "db.sqlite3")!r},\n'
+        '}}\n'
+        f'SITEMAP_ROOT = {str(tmp_path / "sitemaps")!r}\n'
+        'SITEMAP_SHARD_SIZE = 10\n',
+        encoding='utf-8',
+    )
+    project = Path(__file__).resolve().parents[1] / 'blogicum'
+    env = {
+        **os.environ,
+        'DJANGO_SETTINGS_MODULE': 'sitemap_settings',
+        'PYTHONPATH': os.pathsep.join((str(tmp_path), str(project))),
+    }
+
+    def run(*args):
+        return subprocess.run(
+            [sys.executable, '-m', 'django', *args], env=env,
+            capture_output=True, text=True, check=True,
+        ).stdout
+
+    run('migrate', '-v', '0')
+    run('generate_blog_data', '--posts', '30')
+    assert 'Обновлено файлов карты сайта: 0.' not in run('build_sitemaps')
+    assert 'Обновлено файлов карты сайта: 0.' in run('build_sitemaps'), (
+        'Убедитесь, что повторный запуск build_sitemaps в новом процессе '
+        'не перезаписывает неизменившиеся шарды.'
+    )
@@ -0,0 +1,122 @@
+import pytest
+
+pytestmark = [pytest.mark.django_db]
+
+
+def visible_ids():
+    from blog.utils import get_filter_posts
+    return set(get_filter_posts().values_list('id', flat=True))
+
+
+def test_is_visible_follows_post_and_category(
+        mixer, user, published_category):
+    post = mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        is_published=True
+    )
+    assert post.is_visible and post.id in visible_ids(), (
+        'Убедитесь, что опубликованный пост в опубликованной категории '
+        'помечается как видимый.'
+    )
+
+    post.is_published = False
+    post.save()
+    assert post.id not in visible_ids()
+
+    post.is_published = True
+    post.save()
+    published_category.is_published = False
+    published_category.save()
+    assert post.id not in visible_ids(), (
+        'Убедитесь, что снятие категории с публикации скрывает её посты.'
+    )
+
+    published_category.is_published = True
+    published_category.save()
+    assert post.id in visible_ids()
+
+    published_category.delete()
+    post.refresh_from_db()
+    assert post.category is None and not post.is_visible, (
+        'Убедитесь, что посты удалённой категории скрываются.'
+    )
+
+
+def test_unpublished_post_stays_hidden_on_category_publish(
+        mixer, user, published_category):
+    post = mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        is_published=False
+    )
+    published_category.save()
+    post.refresh_from_db()
+    assert not post.is_visible
+
+
+def test_post_detail_visibility_in_one_query(
+        mixer, user, user_client, another_user_client, unlogged_client,
+        published_category):
+    from datetime import timedelta
+
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+    from django.utils import timezone
+
+    visible = mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        pub_date=timezone.now() - timedelta(days=1)
+    )
+    with CaptureQueriesContext(connection) as captured:
+        assert unlogged_client.get(f'/posts/{visible.id}/').status_code == 200
+    assert len(captured) == 2, (
+        'Убедитесь, что страница поста загружает пост вместе с автором, '
+        'категорией и местоположением одним запросом.'
+    )
+
+    hidden = (
+        mixer.blend('blog.Post', author=user, category=published_category,
+                    is_published=False),
+        mixer.blend('blog.Post', author=user, category=published_category,
+                    pub_date=timezone.now() + timedelta(days=1)),
+        mixer.blend('blog.Post', author=user, category=None),
+    )
+    for post in hidden:
+        url = f'/posts/{post.id}/'
+        assert another_user_client.get(url).status_code == 404, (
+            'Убедитесь, что скрытый пост недоступен другим пользователям.'
+        )
+        assert user_client.get(url).status_code == 200, (
+            'Убедитесь, что автор видит свой скрытый пост.'
+        )
+
+
+def test_partial_save_writes_visibility(
+        mixer, post_with_published_location):
+    from blog.models import Post
+
+    post = post_with_published_location
+    post.is_published = False
+    post.save(update_fields=['is_published'])
+    assert not Post.objects.get(pk=post.pk).is_visible, (
+        'Убедитесь, что save(update_fields=[\'is_published\']) '
+        'записывает и пересчитанный флаг видимости.'
+    )
+    post.is_published = True
+    post.category = mixer.blend('blog.Category', is_published=False)
+    post.save(update_fields=['is_published', 'category'])
+    assert not Post.objects.get(pk=post.pk).is_visible
+
+
+def test_raw_save_keeps_visibility(
+        django_assert_num_queries, post_with_published_location):
+    from django.db.models.signals import pre_save
+
+    from blog.models import Post
+
+    post = post_with_published_location
+    with django_assert_num_queries(0):
+        pre_save.send(Post, instance=post, raw=True, update_fields=None)
+    assert post.is_visible, (
+        'Убедитесь, что при загрузке фикстур флаг видимости не '
+        'пересчитывается запросами к категориям.'
+    )
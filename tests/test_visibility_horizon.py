@@ -0,0 +1,58 @@
+import time
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_horizon_caps_timeouts(mixer, user, published_category):
+    from blog.caching import cap_timeout, get_visibility_horizon
+
+    assert get_visibility_horizon() is None
+    assert cap_timeout(60) == 60
+
+    pub_date = timezone.now() + timedelta(seconds=30)
+    mixer.blend('blog.Post', author=user, category=published_category,
+                pub_date=pub_date + timedelta(seconds=30))
+    mixer.blend('blog.Post', author=user, category=published_category,
+                pub_date=pub_date)
+    mixer.blend('blog.Post', author=user, category=published_category,
+                pub_date=pub_date - timedelta(seconds=10),
+                is_published=False)
+    assert get_visibility_horizon() == pub_date, (
+        'Убедитесь, что горизонт видимости — дата ближайшего видимого '
+        'отложенного поста.'
+    )
+    assert 0 < cap_timeout(600) <= 30
+    assert cap_timeout(10) == 10
+
+
+def test_scheduled_post_appears_on_time(
+        mixer, user, unlogged_client, published_category,
+        post_with_published_location):
+    scheduled = mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        title='Отложенный пост',
+        pub_date=timezone.now() + timedelta(seconds=1.5),
+    )
+    pages = ('/', f'/category/{published_category.slug}/')
+    for url in pages:
+        assert scheduled.title not in unlogged_client.get(url).content.decode()
+    feed = unlogged_client.get('/feeds/rss/')
+
+    time.sleep(1.6)
+    for url in pages:
+        assert scheduled.title in unlogged_client.get(url).content.decode(), (
+            f'Убедитесь, что кеш страницы `{url}` не переживает момент '
+            'публикации отложенного поста.'
+        )
+    fresh = unlogged_client.get(
+        '/feeds/rss/', HTTP_IF_NONE_MATCH=feed['ETag']
+    )
+    assert fresh.status_code == 200, (
+        'Убедитесь, что ETag ленты меняется, когда отложенный пост '
+        'становится видимым.'
+    )
+    assert scheduled.title in fresh.content.decode()